@@ -0,0 +1,4 @@
+"""
+Benchmarks for the game engines and AI players. Run a benchmark with `python -m benchmarks.<name>`,
+or the whole suite with `python -m benchmarks run` (see __main__.py).
+"""
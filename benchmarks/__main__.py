@@ -0,0 +1,45 @@
+"""
+Run the benchmark suite and compare its results with a baseline.
+Usage:
+    python -m benchmarks run [-o RESULTS.json] [--players NAME ...] [--no_primitives] [-r REPEAT] [--player_repeat N] [--budget SECONDS]
+    python -m benchmarks compare BASELINE.json [CURRENT.json] [--threshold 0.1]
+Without CURRENT.json, compare runs the suite first. It exits with status 1 if any benchmark regressed.
+"""
+import argparse
+import sys
+from .suite import PLAYERS, REPEAT, PLAYER_REPEAT, BUDGET, THRESHOLD, run_suite, save, load, compare, unit
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark suite for the game engines and players')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ('run', 'compare'):
+        subparser = commands.add_parser(command)
+        if command == 'compare':
+            subparser.add_argument('baseline', type=str, help='Baseline results file')
+            subparser.add_argument('current', type=str, nargs='?', default=None, help='Results file to compare, the suite is run if omitted')
+            subparser.add_argument('--threshold', type=float, default=THRESHOLD, help='Relative slowdown flagged as a regression')
+        subparser.add_argument('--output', '-o', type=str, default=None, help='Save the results of the run to a JSON file')
+        subparser.add_argument('--players', type=str, nargs='*', default=None, choices=list(PLAYERS), help='Players to benchmark (default: all)')
+        subparser.add_argument('--no_primitives', action='store_true', help='Skip the Game primitive micro-benchmarks')
+        subparser.add_argument('--repeat', '-r', type=int, default=REPEAT, help='Runs of each primitive benchmark')
+        subparser.add_argument('--player_repeat', type=int, default=PLAYER_REPEAT, help='Moves timed per player and position')
+        subparser.add_argument('--budget', type=float, default=BUDGET, help='Seconds of each throughput benchmark, 0 to skip them')
+    args = parser.parse_args()
+
+    if args.command == 'compare' and args.current is not None:
+        current = load(args.current)
+    else:
+        current = run_suite(primitives=not args.no_primitives, players=args.players, repeat=args.repeat,
+                            player_repeat=args.player_repeat, budget=args.budget)
+        if args.output is not None:
+            save(current, args.output)
+
+    if args.command == 'run':
+        for name, value in current['results'].items():
+            spread = current.get('spread', {}).get(name)
+            print(f"{name:<44}{value:>12.3f} {unit(name)}" + (f"  (IQR {spread:.3f})" if spread is not None else ""))
+    else:
+        regressions = compare(load(args.baseline), current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
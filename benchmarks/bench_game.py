@@ -0,0 +1,40 @@
+"""
+Compare the list-based TicTacToe with BitboardTicTacToe on the primitives used by the searchers.
+TicTacToe tracks its winner incrementally, so wins and game_over cost about the same on both engines; the bitboards
+are faster on empty_cells, copy and moves, which is what makes searches faster on them (see bench_search).
+Usage: python -m benchmarks.bench_game
+"""
+import timeit
+from project.game import TicTacToe, BitboardTicTacToe
+
+NUMBER = 100000
+# Mid-game position without a winner: X at (0,0), (1,1); O at (0,2), (2,2)
+MOVES = [(0, 0), (0, 2), (1, 1), (2, 2)]
+
+def make_game(game_class):
+    game = game_class()
+    for x, y in MOVES:
+        game.set_move(x, y, game.curr_player)
+    return game
+
+def set_reset(game):
+    game.set_move(1, 0, game.curr_player)
+    game.reset_move(1, 0)
+
+BENCHMARKS = {
+    'wins': lambda game: game.wins('X'),
+    'game_over': lambda game: game.game_over(),
+    'empty_cells': lambda game: game.empty_cells(),
+    'copy': lambda game: game.copy(),
+    'set_move+reset_move': set_reset,
+}
+
+if __name__ == '__main__':
+    print(f"{'operation':<22}{'TicTacToe':>14}{'Bitboard':>14}{'speedup':>10}")
+    for name, func in BENCHMARKS.items():
+        timings = []
+        for game_class in (TicTacToe, BitboardTicTacToe):
+            game = make_game(game_class)
+            seconds = min(timeit.repeat(lambda: func(game), number=NUMBER, repeat=5))
+            timings.append(seconds / NUMBER * 1e9)
+        print(f"{name:<22}{timings[0]:>11.0f} ns{timings[1]:>11.0f} ns{timings[0] / timings[1]:>9.1f}x")
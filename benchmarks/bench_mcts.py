@@ -0,0 +1,42 @@
+"""
+Simulations per second and peak memory of one MCTS Player move.
+Usage: python -m benchmarks.bench_mcts [-n NUM_SIMULATIONS] [-K ROLLOUTS_PER_LEAF] [-g tictactoe|bitboard]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from project import Game
+from project.tictactoe import TTT_MCTSPlayer
+from project.tictactoe.mcts import NUM_SIMULATIONS
+
+REPEAT = 3
+
+def make_positions(game_name):
+    empty = Game(game=game_name)
+    opening = Game(game=game_name)
+    opening.push(0, 0)
+    return {'empty board': empty, 'X at (0, 0)': opening}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the MCTS player')
+    parser.add_argument('--num_simulations', '-n', type=int, default=NUM_SIMULATIONS, help='Simulations per move')
+    parser.add_argument('--rollouts_per_leaf', '-K', type=int, default=1, help='Random playouts per expanded leaf')
+    parser.add_argument('--game', '-g', type=str, default='tictactoe', help='Game engine to search on')
+    args = parser.parse_args()
+    
+    random.seed(0)
+    for name, game in make_positions(args.game).items():
+        best = float('inf')
+        for _ in range(REPEAT):
+            player = TTT_MCTSPlayer(game.curr_player, num_simulations=args.num_simulations, rollouts_per_leaf=args.rollouts_per_leaf)
+            start = time.perf_counter()
+            player.get_move(game)
+            best = min(best, time.perf_counter() - start)
+        
+        tracemalloc.start()
+        TTT_MCTSPlayer(game.curr_player, num_simulations=args.num_simulations, rollouts_per_leaf=args.rollouts_per_leaf).get_move(game)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        playouts = args.num_simulations * args.rollouts_per_leaf
+        print(f"{name:<14} {args.num_simulations / best:>10,.0f} simulations/s {playouts / best:>11,.0f} playouts/s  peak memory {peak / 2**20:6.1f} MiB")
@@ -0,0 +1,34 @@
+"""
+Scaling of the root-parallel MCTS Player: total simulations per second against the number of workers.
+Usage: python -m benchmarks.bench_mcts_parallel [-n NUM_SIMULATIONS] [-w WORKERS ...] [-g tictactoe|bitboard]
+"""
+import argparse
+import os
+import random
+import time
+from project import Game
+from project.tictactoe import TTT_MCTSPlayer
+from project.tictactoe.mcts import NUM_SIMULATIONS
+
+REPEAT = 3
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the root-parallel MCTS player')
+    parser.add_argument('--num_simulations', '-n', type=int, default=NUM_SIMULATIONS, help='Simulations per worker')
+    parser.add_argument('--workers', '-w', type=int, nargs='+', default=[1, 2, 4, 8], help='Numbers of workers to compare')
+    parser.add_argument('--game', '-g', type=str, default='tictactoe', help='Game engine to search on')
+    args = parser.parse_args()
+    
+    random.seed(0)
+    game = Game(game=args.game)
+    print(f"{os.cpu_count()} CPUs available")
+    for num_workers in args.workers:
+        player = TTT_MCTSPlayer(game.curr_player, num_simulations=args.num_simulations, num_workers=num_workers)
+        player.get_move(game) # Start the worker pool outside of the timing
+        best = float('inf')
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            player.get_move(game)
+            best = min(best, time.perf_counter() - start)
+        total = args.num_simulations * num_workers
+        print(f"{num_workers:>2} workers {total / best:>10,.0f} simulations/s  {best:6.3f} s/move")
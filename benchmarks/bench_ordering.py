@@ -0,0 +1,48 @@
+"""
+Nodes searched by the Alpha-Beta player with and without each move ordering heuristic.
+Usage: python -m benchmarks.bench_ordering
+"""
+from project.game import TicTacToe
+from project.tictactoe import TTT_AlphaBetaPlayer
+from project.tictactoe.move_ordering import MoveOrdering
+from .bench_search import count_nodes
+
+# Opening positions: (x, y) moves played from the empty board
+POSITIONS = [
+    [(0, 0)],
+    [(1, 1)],
+    [(0, 1)],
+    [(0, 0), (1, 1)],
+    [(1, 1), (0, 1)],
+    [(0, 1), (2, 2), (1, 1)],
+]
+
+CONFIGS = {
+    'no ordering': dict(static=False, killers=False, history=False),
+    'static prior': dict(static=True, killers=False, history=False),
+    'killers': dict(static=False, killers=True, history=False),
+    'history': dict(static=False, killers=False, history=True),
+    'all heuristics': dict(static=True, killers=True, history=True),
+}
+
+def make_game(moves):
+    game = TicTacToe()
+    for x, y in moves:
+        game.push(x, y)
+    return game
+
+def search_nodes(config, tt_size):
+    nodes = 0
+    for moves in POSITIONS:
+        game = make_game(moves)
+        player = TTT_AlphaBetaPlayer(game.curr_player, tt_size=tt_size, ordering=MoveOrdering(**config))
+        player.get_move(game)
+        nodes += player.nodes
+    return nodes
+
+if __name__ == '__main__':
+    full_tree = sum(count_nodes(make_game(moves), 9 - len(moves)) for moves in POSITIONS)
+    print(f"Total nodes over {len(POSITIONS)} opening positions (minimax without cutoffs: {full_tree})")
+    print(f"{'ordering':<18}{'no TT':>10}{'with TT':>10}")
+    for name, config in CONFIGS.items():
+        print(f"{name:<18}{search_nodes(config, 0):>10}{search_nodes(config, 100000):>10}")
@@ -0,0 +1,41 @@
+"""
+Training throughput of the Q-Learning Player, sequential (batch size 1) and batched, with the quality of the
+trained table: the share of reachable positions where its greedy move is optimal according to the oracle table.
+Usage: python -m benchmarks.bench_qlearning [-e NUM_EPISODES] [-b BATCH_SIZE ...]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import numpy as np
+from project import TicTacToe
+from project.tictactoe.q_learning import TTT_QPlayer, NUM_EPISODES
+from project.tictactoe.oracle import load_oracle_table, MOVES_MASK, REACHABLE
+
+def optimal_rate(player: TTT_QPlayer, table: np.ndarray) -> float:
+    """
+    Share of reachable non-terminal positions where the greedy move of the player is optimal.
+    """
+    states = np.flatnonzero((table & REACHABLE != 0) & (table & MOVES_MASK != 0))
+    moves = player.best_actions(states)
+    optimal = (table[states].astype(np.int64) & MOVES_MASK) >> moves & 1
+    return float((optimal & player.seen[player.table_index(states)[0]]).mean())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark Q-Learning training')
+    parser.add_argument('--num_episodes', '-e', type=int, default=NUM_EPISODES, help='Training episodes')
+    parser.add_argument('--batch_sizes', '-b', type=int, nargs='+', default=[1, 32, 128, 512], help='Batch sizes to compare')
+    args = parser.parse_args()
+    
+    table = load_oracle_table()
+    for batch_size in args.batch_sizes:
+        random.seed(0)
+        player = TTT_QPlayer('X', batch_size=batch_size)
+        player.num_episodes = args.num_episodes
+        start = time.perf_counter()
+        # Silence the progress bar
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            player.train(TicTacToe())
+        elapsed = time.perf_counter() - start
+        print(f"batch {batch_size:>4} {args.num_episodes / elapsed:>10,.0f} episodes/s  {elapsed:6.2f} s  optimal moves {optimal_rate(player, table):.3f}")
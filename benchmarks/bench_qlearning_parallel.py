@@ -0,0 +1,56 @@
+"""
+Wall-clock training time of the Q-Learning Player to reach a target non-loss rate against the Minimax Player,
+for several numbers of training workers. Players are trained from scratch on growing numbers of episodes until the
+target is reached. The rate is measured over 18 games: the Q Player plays X and O, after each of the 9 openings.
+Usage: python -m benchmarks.bench_qlearning_parallel [-w WORKERS ...] [--target RATE] [-e EPISODES ...]
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+from project import TicTacToe
+from project.game import CELLS
+from project.tictactoe import TTT_MinimaxPlayer
+from project.tictactoe.q_learning import TTT_QPlayer
+
+def non_loss_rate(player: TTT_QPlayer) -> float:
+    games = 0
+    non_losses = 0
+    for letter in ('X', 'O'):
+        player.letter = letter
+        opponent = TTT_MinimaxPlayer('O' if letter == 'X' else 'X')
+        for x, y in CELLS:
+            game = TicTacToe()
+            game.set_move(x, y, 'X')
+            while not game.game_over():
+                current = player if game.curr_player == letter else opponent
+                move = current.get_move(game)
+                game.set_move(move[0], move[1], current.letter)
+            games += 1
+            non_losses += game.winner != opponent.letter
+    player.letter = 'X'
+    return non_losses / games
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark parallel Q-Learning training')
+    parser.add_argument('--workers', '-w', type=int, nargs='+', default=[1, 2, 4, 8], help='Numbers of workers to compare')
+    parser.add_argument('--target', type=float, default=1.0, help='Non-loss rate to reach against the Minimax Player')
+    parser.add_argument('--episodes', '-e', type=int, nargs='+', default=[25000, 50000, 100000, 200000, 400000], help='Training budgets to try, in order')
+    args = parser.parse_args()
+    
+    print(f"{os.cpu_count()} CPUs available")
+    for num_workers in args.workers:
+        for num_episodes in args.episodes:
+            player = TTT_QPlayer('X', num_workers=num_workers)
+            player.num_episodes = num_episodes
+            start = time.perf_counter()
+            # Silence the progress messages
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                player.train(TicTacToe())
+            elapsed = time.perf_counter() - start
+            rate = non_loss_rate(player)
+            if rate >= args.target:
+                break
+        status = 'reached' if rate >= args.target else 'not reached'
+        print(f"{num_workers:>2} workers  {status} {args.target:.2f} after {num_episodes:>7} episodes  rate {rate:.3f}  training {elapsed:6.2f} s")
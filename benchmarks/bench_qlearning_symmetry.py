@@ -0,0 +1,30 @@
+"""
+Q-Learning Player with and without the symmetry-reduced table: table size, rows actually trained, and the share of
+optimal greedy moves (see bench_qlearning) after growing numbers of training episodes.
+Usage: python -m benchmarks.bench_qlearning_symmetry [-e EPISODES ...] [-b BATCH_SIZE]
+"""
+import argparse
+import contextlib
+import io
+from project import TicTacToe
+from project.tictactoe.q_learning import TTT_QPlayer, BATCH_SIZE
+from project.tictactoe.oracle import load_oracle_table
+from .bench_qlearning import optimal_rate
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the symmetry-reduced Q-table')
+    parser.add_argument('--episodes', '-e', type=int, nargs='+', default=[5000, 10000, 25000, 50000, 100000, 200000], help='Training budgets')
+    parser.add_argument('--batch_size', '-b', type=int, default=BATCH_SIZE, help='Training batch size')
+    args = parser.parse_args()
+    
+    table = load_oracle_table()
+    for num_episodes in args.episodes:
+        for symmetric in (False, True):
+            player = TTT_QPlayer('X', batch_size=args.batch_size, symmetric=symmetric)
+            player.num_episodes = num_episodes
+            # Silence the progress messages
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                player.train(TicTacToe())
+            name = 'symmetric' if symmetric else 'plain'
+            print(f"{num_episodes:>7} episodes {name:<9}  table {player.Q.nbytes / 2**10:6.0f} KiB  "
+                  f"rows trained {int(player.seen.sum()):>5}  optimal moves {optimal_rate(player, table):.3f}")
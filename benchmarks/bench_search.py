@@ -0,0 +1,51 @@
+"""
+Nodes per second of the Minimax and Alpha-Beta players on the empty-minus-one-move position, counting the nodes
+each search actually visited. The size of the full game tree is printed for reference.
+Usage: python -m benchmarks.bench_search [-g tictactoe|bitboard]
+"""
+import argparse
+import time
+from project import Game
+from project.tictactoe import TTT_MinimaxPlayer, TTT_AlphaBetaPlayer
+
+REPEAT = 3
+
+def count_nodes(game, depth):
+    """
+    Number of nodes of the full game tree below the given position (what a full-width search visits).
+    """
+    if depth == 0 or game.game_over():
+        return 1
+    nodes = 1
+    for x, y in game.empty_cells():
+        game.set_move(x, y, game.curr_player)
+        nodes += count_nodes(game, depth - 1)
+        game.reset_move(x, y)
+    return nodes
+
+def make_position(game_name):
+    game = Game(game=game_name)
+    game.set_move(0, 0, 'X')
+    return game
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark search players')
+    parser.add_argument('--game', '-g', type=str, default='tictactoe', help='Game engine to search on')
+    args = parser.parse_args()
+    
+    game = make_position(args.game)
+    nodes = count_nodes(game.copy(), game.num_empty_cells())
+    print(f"Position: X at (0, 0), O to move, {nodes} nodes in the full tree")
+    for player_class in (TTT_MinimaxPlayer, TTT_AlphaBetaPlayer):
+        best = float('inf')
+        for _ in range(REPEAT):
+            # A fresh player per run, so the transposition table starts empty
+            player = player_class('O')
+            start = time.perf_counter()
+            move = player.get_move(game)
+            elapsed = time.perf_counter() - start
+            if elapsed < best:
+                best, visited = elapsed, player.nodes
+        print(f"{str(player):<20} move {tuple(move)}  {best:.3f}s  {visited} nodes  {visited / best:,.0f} nodes/s")
+        if hasattr(player, 'tt'):
+            print(f"{'':<20} transposition table: {player.tt.stats()}")
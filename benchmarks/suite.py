@@ -0,0 +1,220 @@
+"""
+Benchmark suite: Game primitives, and the get_move latency and throughput of every player, on fixed positions
+with fixed seeds.
+
+Results are flat dictionaries keyed by 'primitive/<engine>/<operation>/<position>' (ns per call),
+'get_move/<player>/<position>' (ms per move) or 'throughput/<player>/<position>' (moves per second, higher is
+better). The interquartile range of each get_move timing is kept in 'spread'. Reports are saved as JSON with the
+machine they were measured on, and compare() flags the benchmarks that got worse than a baseline by more than a
+threshold, and by more than the run-to-run noise of the get_move timings.
+"""
+import contextlib
+import datetime
+import io
+import json
+import platform
+import random
+import statistics
+import time
+import timeit
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from project.game import TicTacToe, BitboardTicTacToe
+from project.player import RandomPlayer
+from project.tictactoe import TTT_MinimaxPlayer, TTT_AlphaBetaPlayer, TTT_MCTSPlayer, TTT_QPlayer, TTT_OraclePlayer
+
+SEED = 2050
+NUMBER = 20000
+REPEAT = 5
+# get_move timings vary much more between runs than the primitives, so they take more samples
+PLAYER_REPEAT = 15
+# Seconds of get_move calls per player and position for the throughput benchmarks
+BUDGET = 0.5
+THRESHOLD = 0.1
+
+# Positions without a winner, as moves played alternately from the empty board by X then O
+POSITIONS = {
+    'opening': [(1, 1)],
+    'midgame': [(0, 0), (0, 2), (1, 1), (2, 2)],
+    'endgame': [(0, 0), (1, 1), (2, 2), (0, 2), (2, 0), (1, 0), (1, 2)],
+}
+ENGINES = {'tictactoe': TicTacToe, 'bitboard': BitboardTicTacToe}
+
+def push_pop(game):
+    x, y = game.empty_cells()[0]
+    game.push(x, y)
+    game.pop()
+
+PRIMITIVES = {
+    'wins': lambda game: game.wins('X'),
+    'game_over': lambda game: game.game_over(),
+    'empty_cells': lambda game: game.empty_cells(),
+    'copy': lambda game: game.copy(),
+    'push+pop': push_pop,
+}
+
+_q_player = None
+
+def q_player(letter: str) -> TTT_QPlayer:
+    """
+    The Q-Learning player, trained or loaded once per process like in main.py.
+    """
+    global _q_player
+    if _q_player is None:
+        _q_player = TTT_QPlayer('X')
+        with contextlib.redirect_stdout(io.StringIO()):
+            _q_player.load_or_train(TicTacToe())
+    _q_player.letter = letter
+    return _q_player
+
+# Players built fresh for each measured move, so tables and trees kept between moves start empty
+PLAYERS = {
+    'random': RandomPlayer,
+    'minimax': TTT_MinimaxPlayer,
+    'alphabeta': TTT_AlphaBetaPlayer,
+    'mcts': TTT_MCTSPlayer,
+    'qlearning': q_player,
+    'oracle': TTT_OraclePlayer,
+}
+
+def make_position(name: str, engine: str = 'tictactoe'):
+    game = ENGINES[engine]()
+    for x, y in POSITIONS[name]:
+        game.set_move(x, y, game.curr_player)
+    return game
+
+def bench_primitives(number: int = NUMBER, repeat: int = REPEAT) -> Dict[str, float]:
+    """
+    :return: nanoseconds per call of each primitive, best of repeat runs of number calls
+    """
+    results = {}
+    for engine in ENGINES:
+        for operation, func in PRIMITIVES.items():
+            for position in POSITIONS:
+                game = make_position(position, engine)
+                seconds = min(timeit.repeat(lambda: func(game), number=number, repeat=repeat))
+                results[f"primitive/{engine}/{operation}/{position}"] = seconds / number * 1e9
+    return results
+
+def bench_players(players: Optional[List[str]] = None, repeat: int = PLAYER_REPEAT) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    :return: (median milliseconds of a get_move call of each player on each position over repeat moves,
+              interquartile range of these timings in milliseconds)
+    """
+    results, spread = {}, {}
+    for name in players or PLAYERS:
+        for position in POSITIONS:
+            game = make_position(position)
+            timings = []
+            for i in range(repeat):
+                random.seed(SEED + i)
+                player = PLAYERS[name](game.curr_player)
+                start = time.perf_counter()
+                player.get_move(game)
+                timings.append((time.perf_counter() - start) * 1e3)
+            key = f"get_move/{name}/{position}"
+            results[key] = statistics.median(timings)
+            if repeat > 1:
+                quartiles = statistics.quantiles(timings, n=4)
+                spread[key] = quartiles[2] - quartiles[0]
+    return results, spread
+
+def bench_throughput(players: Optional[List[str]] = None, budget: float = BUDGET) -> Dict[str, float]:
+    """
+    Play get_move calls of each player on each position until budget seconds have passed, with a fresh player and
+    seed for each call as in bench_players(). At least one call is made.
+    :return: moves per second of each player on each position
+    """
+    results = {}
+    for name in players or PLAYERS:
+        for position in POSITIONS:
+            game = make_position(position)
+            num_moves = 0
+            start = time.perf_counter()
+            while True:
+                random.seed(SEED + num_moves)
+                PLAYERS[name](game.curr_player).get_move(game)
+                num_moves += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= budget:
+                    break
+            results[f"throughput/{name}/{position}"] = num_moves / elapsed
+    return results
+
+def run_suite(primitives: bool = True, players: Optional[List[str]] = None, repeat: int = REPEAT, number: int = NUMBER,
+              player_repeat: int = PLAYER_REPEAT, budget: float = BUDGET) -> dict:
+    """
+    Run the suite and return the results with the machine they were measured on.
+    :param primitives: run the Game primitive micro-benchmarks
+    :param players: players whose get_move is measured, all if None, none if empty
+    :param budget: seconds of each throughput benchmark, skipped if 0
+    """
+    results, spread = {}, {}
+    if primitives:
+        results.update(bench_primitives(number, repeat))
+    if players is None or players:
+        latencies, spread = bench_players(players, player_repeat)
+        results.update(latencies)
+        if budget > 0:
+            results.update(bench_throughput(players, budget))
+    return {
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(), 'processor': platform.processor()},
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'seed': SEED,
+        'results': results,
+        'spread': spread,
+    }
+
+def save(report: dict, path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def unit(name: str) -> str:
+    return {'primitive': 'ns', 'get_move': 'ms', 'throughput': '/s'}[name.split('/')[0]]
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[str]:
+    """
+    Print the results of both reports side by side, then the benchmarks found in only one of them.
+    A get_move timing is only flagged if its difference is also larger than the interquartile range of both runs,
+    so that the noise of a few slow moves is not reported as a regression.
+    :param threshold: relative slowdown above which a benchmark is flagged as a regression
+    :return: names of the regressed benchmarks
+    """
+    regressions = []
+    print(f"{'benchmark':<44}{'baseline':>16}{'current':>16}{'change':>9}")
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            continue
+        change = after / before - 1 if before else 0
+        # Relative slowdown: throughputs get worse when they decrease
+        if name.startswith('throughput/'):
+            slowdown = before / after - 1 if after else 0
+        else:
+            slowdown = change
+        noise = max(baseline.get('spread', {}).get(name, 0), current.get('spread', {}).get(name, 0))
+        flag = ''
+        if slowdown > threshold and abs(after - before) > noise:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif slowdown < -threshold and abs(after - before) > noise:
+            flag = '  faster'
+        elif abs(slowdown) > threshold:
+            flag = '  within noise'
+        print(f"{name:<44}{before:>13.3f} {unit(name)}{after:>13.3f} {unit(name)}{change:>+8.1%}{flag}")
+
+    missing = [name for name in baseline['results'] if name not in current['results']]
+    added = [name for name in current['results'] if name not in baseline['results']]
+    if missing:
+        print(f"\nMissing from the current run ({len(missing)}):")
+        for name in missing:
+            print(f"    {name}")
+    if added:
+        print(f"\nNot in the baseline ({len(added)}):")
+        for name in added:
+            print(f"    {name}")
+    return regressions
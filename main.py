@@ -1,37 +1,98 @@
 from project.gameplay import GamePlay
+from project.tournament import run_tournament
+from project.headless import run_headless
+from project.results import ResultsWriter
+from project.profiling import Profiler
 from project import Game, Player
 
 
 import argparse
+import contextlib
 
 if __name__ == '__main__':
     
     # Initialize Argument Parser for command line arguments
     parser = argparse.ArgumentParser(description='Play Tic Tac Toe')
     parser.add_argument('--game', '-g', type=str, default='tictactoe', help='Choose the game to play')
-    parser.add_argument('--player1', '-p1', type=str, default='human', choices=['minimax', 'alphabeta', 'mcts', 'qlearning', 'human', 'random'], help='Choose player 1')
-    parser.add_argument('--player2', '-p2', type=str, default='random', choices=['minimax', 'alphabeta', 'mcts', 'qlearning', 'human', 'random'], help='Choose player 2')
-    parser.add_argument('--mode', '-m', type=str, default='plain', choices=['silent', 'plain', 'ui'], help='Choose visualization mode')
+    parser.add_argument('--board_size', '-s', type=int, default=15, help='Board size for Gomoku')
+    parser.add_argument('--win_length', '-k', type=int, default=5, help='Number of stones in a row to win Gomoku')
+    parser.add_argument('--player1', '-p1', type=str, default='human', choices=['minimax', 'alphabeta', 'mcts', 'qlearning', 'oracle', 'human', 'random'], help='Choose player 1')
+    parser.add_argument('--player2', '-p2', type=str, default='random', choices=['minimax', 'alphabeta', 'mcts', 'qlearning', 'oracle', 'human', 'random'], help='Choose player 2')
+    parser.add_argument('--mode', '-m', type=str, default='plain', choices=['silent', 'headless', 'plain', 'ui'], help='Choose visualization mode')
     parser.add_argument('--num_games', '-n', type=int, default=1, help='Number of games to run')
     parser.add_argument('--timeout', '-t', type=int, default=10, help='Timeout for each move')
     parser.add_argument('--no_timeout', '-nt', action='store_true', help='No timeout for each move')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Number of processes playing the games')
+    parser.add_argument('--mcts_workers', type=int, default=1, help='Number of processes for each MCTS player')
+    parser.add_argument('--mcts_rollouts', type=int, default=1, help='Number of random playouts per expanded MCTS leaf')
+    parser.add_argument('--mcts_solver', action='store_true', help='Prove won, lost and drawn positions in MCTS')
+    parser.add_argument('--q_workers', type=int, default=1, help='Number of processes training each Q-Learning player')
+    parser.add_argument('--q_symmetric', action='store_true', help='Share Q-values between rotations and reflections of a board')
+    parser.add_argument('--output', '-o', type=str, default=None, help='Log the results of each game to a .jsonl or .csv file')
+    parser.add_argument('--log_moves', action='store_true', help='Also log each move to the output file')
+    parser.add_argument('--stats', action='store_true', help='Report the search statistics of the AI players')
+    parser.add_argument('--profile', type=str, default=None, choices=['cpu', 'mem'], help='Profile the time or memory of each player')
+    parser.add_argument('--profile_output', type=str, default='profile', help='Prefix of the profile report files')
+    parser.add_argument('--retrain', action='store_true', help='Train the Q-Learning players again instead of loading their saved tables')
     args = parser.parse_args()
     
-    if args.mode == 'silent' and (args.player1 == 'human' or args.player2 == 'human'):
-        raise ValueError("Silent mode is not available for Human Player! Please choose between 'plain' and 'ui' modes.")
+    if args.mode in ('silent', 'headless') and (args.player1 == 'human' or args.player2 == 'human'):
+        raise ValueError("Silent and headless modes are not available for Human Player! Please choose between 'plain' and 'ui' modes.")
+    
+    if args.workers > 1 and (args.mode == 'ui' or args.player1 == 'human' or args.player2 == 'human'):
+        raise ValueError("Parallel games are not available for Human Player and 'ui' mode!")
+    
+    if args.output is not None and args.mode == 'ui':
+        raise ValueError("The results log is not available in 'ui' mode!")
+    
+    if args.log_moves and args.output is None:
+        raise ValueError("Please choose an output file for the move log with --output.")
+    
+    if args.profile is not None and args.workers > 1:
+        raise ValueError("Profiling is not available for parallel games!")
+    
+    if args.game == 'gomoku':
+        for player in (args.player1, args.player2):
+            if player not in ('mcts', 'human', 'random'):
+                raise ValueError(f"Player {player} only plays Tic Tac Toe! Please choose between 'mcts', 'human' and 'random' for Gomoku.")
+            if player == 'human' and args.mode != 'ui':
+                raise ValueError("Human Player can only play Gomoku in 'ui' mode.")
     
     if args.no_timeout:
         timeout = None
     else:
         timeout = args.timeout
         
-    game, (x_player, o_player) = Game(game=args.game), Player(player1=args.player1, player2=args.player2)
-    
-    # Train Q-Learning Player
-    if args.player1 == 'qlearning':
-        x_player.train(game)
-    if args.player2 == 'qlearning':
-        o_player.train(game)
-    gameplay = GamePlay(x_player=x_player, o_player=o_player, game=game, mode=args.mode, num_games=args.num_games, timeout=timeout)
-    gameplay.run()
+    game_args = dict(game=args.game, size=args.board_size, k=args.win_length)
+    player_args = dict(player1=args.player1, player2=args.player2, mcts_workers=args.mcts_workers, mcts_rollouts=args.mcts_rollouts, mcts_solver=args.mcts_solver, q_workers=args.q_workers, q_symmetric=args.q_symmetric)
+    game, (x_player, o_player) = Game(**game_args), Player(**player_args)
+    
+    x_player.enable_stats(args.stats)
+    o_player.enable_stats(args.stats)
+    
+    profiler = Profiler(args.profile, args.profile_output) if args.profile is not None else None
+    
+    # Load the saved Q-Learning Player tables, training them on the first run
+    for label, player, choice in (('player1', x_player, args.player1), ('player2', o_player, args.player2)):
+        if choice == 'qlearning':
+            with profiler.phase(f"{label} {player} train") if profiler is not None else contextlib.nullcontext():
+                player.load_or_train(game, retrain=args.retrain)
+        if profiler is not None:
+            profiler.wrap(player, label)
+    
+    results = ResultsWriter(args.output, log_moves=args.log_moves) if args.output is not None else None
+    try:
+        if args.workers > 1:
+            run_tournament(game_args, player_args, num_games=args.num_games, num_workers=args.workers, timeout=timeout, silent=args.mode != 'plain', progress=args.mode == 'silent', headless=args.mode == 'headless', results=results, stats=args.stats, names=[str(x_player), str(o_player)])
+        elif args.mode == 'headless':
+            run_headless(x_player, o_player, game, num_games=args.num_games, timeout=timeout, results=results)
+        else:
+            gameplay = GamePlay(x_player=x_player, o_player=o_player, game=game, mode=args.mode, num_games=args.num_games, timeout=timeout, results=results)
+            gameplay.run()
+    finally:
+        if results is not None:
+            results.close()
+    
+    if profiler is not None:
+        print(profiler.report())
 
@@ -1,15 +1,19 @@
-from .game import TicTacToe
-from .tictactoe import TTT_HumanPlayer, TTT_MinimaxPlayer, TTT_AlphaBetaPlayer, TTT_MCTSPlayer, TTT_QPlayer
+from .game import TicTacToe, BitboardTicTacToe, Gomoku
+from .tictactoe import TTT_HumanPlayer, TTT_MinimaxPlayer, TTT_AlphaBetaPlayer, TTT_MCTSPlayer, TTT_QPlayer, TTT_OraclePlayer
 from .player import RandomPlayer
 
-def Game(game):
+def Game(game, size=15, k=5):
     if game == 'tictactoe':
         game = TicTacToe()
+    elif game == 'bitboard':
+        game = BitboardTicTacToe()
+    elif game == 'gomoku':
+        game = Gomoku(size=size, k=k)
     else:
-        raise ValueError("Invalid game. Please choose between 'tictactoe' and 'gomoku'")
+        raise ValueError("Invalid game. Please choose between 'tictactoe', 'bitboard' and 'gomoku'")
     return game
 
-def Player(player1, player2):
+def Player(player1, player2, mcts_workers=1, mcts_rollouts=1, mcts_solver=False, q_workers=1, q_symmetric=False):
     if player1 == 'random':
         x_player = RandomPlayer('X')
     elif player1 == 'human':
@@ -19,9 +23,11 @@ def Player(player1, player2):
     elif player1 == 'alphabeta':
         x_player = TTT_AlphaBetaPlayer('X')
     elif player1 == 'mcts':
-        x_player = TTT_MCTSPlayer('X')
+        x_player = TTT_MCTSPlayer('X', num_workers=mcts_workers, rollouts_per_leaf=mcts_rollouts, solver=mcts_solver)
     elif player1 == 'qlearning':
-        x_player = TTT_QPlayer('X')
+        x_player = TTT_QPlayer('X', num_workers=q_workers, symmetric=q_symmetric)
+    elif player1 == 'oracle':
+        x_player = TTT_OraclePlayer('X')
     else:
         raise ValueError(f"Player 1 {player1} is not defined.")
     
@@ -34,9 +40,11 @@ def Player(player1, player2):
     elif player2 == 'alphabeta':
         o_player = TTT_AlphaBetaPlayer('O')
     elif player2 == 'mcts':
-        o_player = TTT_MCTSPlayer('O')
+        o_player = TTT_MCTSPlayer('O', num_workers=mcts_workers, rollouts_per_leaf=mcts_rollouts, solver=mcts_solver)
     elif player2 == 'qlearning':
-        o_player = TTT_QPlayer('O')
+        o_player = TTT_QPlayer('O', num_workers=q_workers, symmetric=q_symmetric)
+    elif player2 == 'oracle':
+        o_player = TTT_OraclePlayer('O')
     else:
         raise ValueError(f"Player 2 {player2} is not defined.")
             
@@ -1,9 +1,33 @@
 """
-This module contains the game logic for Tic Tac Toe
+This module contains the game logic for Tic Tac Toe and Gomoku
 """
 from typing import List, Optional
 from abc import ABC, abstractmethod
 
+# All possible winning lines of the 3x3 board
+WIN_LINES = (
+    ((0, 0), (0, 1), (0, 2)),
+    ((1, 0), (1, 1), (1, 2)),
+    ((2, 0), (2, 1), (2, 2)),
+    ((0, 0), (1, 0), (2, 0)),
+    ((0, 1), (1, 1), (2, 1)),
+    ((0, 2), (1, 2), (2, 2)),
+    ((0, 0), (1, 1), (2, 2)),
+    ((2, 0), (1, 1), (0, 2)),
+)
+# Indices of the lines in WIN_LINES passing through each cell
+CELL_LINES = tuple(tuple(tuple(i for i, line in enumerate(WIN_LINES) if (x, y) in line) for y in range(3)) for x in range(3))
+# Offset of each player's counters in TicTacToe.line_counts
+LINE_OFFSET = {'X': 0, 'O': len(WIN_LINES)}
+# Indices in TicTacToe.line_counts updated by each player's move on each cell
+CELL_COUNTERS = {letter: tuple(tuple(tuple(offset + line for line in CELL_LINES[x][y]) for y in range(3)) for x in range(3)) for letter, offset in LINE_OFFSET.items()}
+# Base-3 weight of each cell in the state id (cell (0, 0) is the most significant digit, X = 1, O = 2)
+CELL_POWERS = tuple(tuple(3 ** (8 - (3 * x + y)) for y in range(3)) for x in range(3))
+PLAYER_DIGITS = {'X': 1, 'O': 2}
+# All cells of the board in row-major order
+CELLS = tuple((x, y) for x in range(3) for y in range(3))
+
+
 class Game(ABC):
     
     @abstractmethod
@@ -15,6 +39,13 @@ class Game(ABC):
         """
         pass
     
+    def num_empty_cells(self) -> int:
+        """
+        Get the number of empty cells for the CURRENT state.
+        :return: the number of empty cells
+        """
+        return len(self.empty_cells())
+    
     @abstractmethod
     def print_board(self):
         """
@@ -50,6 +81,23 @@ class Game(ABC):
         """
         pass
 
+    @abstractmethod
+    def push(self, x: int, y: int) -> bool:
+        """
+        Set the move of the current player on board and record it on the move history, so it can be undone with pop().
+        :param x: X coordinate
+        :param y: Y coordinate
+        :return: True if the move is set successfully
+        """
+        pass
+    
+    @abstractmethod
+    def pop(self) -> None:
+        """
+        Undo the last move recorded by push().
+        """
+        pass
+
     @abstractmethod
     def wins(self, player_letter: str, state: Optional[List[List[int]]]) -> bool:
         """
@@ -87,11 +135,22 @@ class Game(ABC):
         return "Game"
     
 class TicTacToe(Game):
+    size = 3
+    k = 3
+    
     def __init__(self):
         #* Initialize board, available moves, last move, and win_combo
         self.board_state = [[None, None, None], [None, None, None], [None, None, None]]
         self.win_combo = []
         self.curr_player = 'X'
+        #* Incremental state: pieces per player on each win line, number of moves and the winner
+        self.line_counts = [0] * (2 * len(WIN_LINES))
+        self.num_moves = 0
+        self.winner = None
+        #* Base-3 index of the board, see CELL_POWERS
+        self.state_id = 0
+        #* Cells (3*x + y) played with push(), undone with pop()
+        self.history = []
     
     def print_board(self):
         height = len(self.board_state)
@@ -130,6 +189,9 @@ class TicTacToe(Game):
                     cells.append([x, y])
         return cells
     
+    def num_empty_cells(self):
+        return 9 - self.num_moves
+    
     def valid_move(self, x, y):
         if self.board_state[x][y] == None:
             return True
@@ -138,56 +200,397 @@ class TicTacToe(Game):
     
     def set_move(self, x, y, player_letter):
         assert self.curr_player == player_letter, f"Invalid player {player_letter}. Current player is {self.curr_player}"
-        if self.valid_move(x, y):
+        if self.board_state[x][y] is None:
             self.board_state[x][y] = player_letter
-            self.curr_player = 'X' if self.curr_player == 'O' else 'O'
+            self.curr_player = 'X' if player_letter == 'O' else 'O'
+            self.num_moves += 1
+            self.state_id += PLAYER_DIGITS[player_letter] * CELL_POWERS[x][y]
+            
+            # Update the counters of the lines through (x, y) and record the first completed line
+            line_counts = self.line_counts
+            for counter in CELL_COUNTERS[player_letter][x][y]:
+                line_counts[counter] += 1
+                if line_counts[counter] == 3 and self.winner is None:
+                    self.winner = player_letter
+                    self.win_combo = list(WIN_LINES[counter - LINE_OFFSET[player_letter]])
             return True
         else:
             return False
     
+    def push(self, x, y):
+        if self.set_move(x, y, self.curr_player):
+            self.history.append(3 * x + y)
+            return True
+        return False
+    
+    def pop(self):
+        cell = self.history.pop()
+        self.reset_move(cell // 3, cell % 3)
+    
     def reset_move(self, x, y):
-        self.curr_player = self.board_state[x][y]
+        player_letter = self.board_state[x][y]
+        self.curr_player = player_letter
         self.board_state[x][y] = None
+        if player_letter is None:
+            return
+        self.num_moves -= 1
+        self.state_id -= PLAYER_DIGITS[player_letter] * CELL_POWERS[x][y]
+        
+        line_counts = self.line_counts
+        broken = False
+        for counter in CELL_COUNTERS[player_letter][x][y]:
+            if line_counts[counter] == 3:
+                broken = True
+            line_counts[counter] -= 1
+        if broken and self.winner == player_letter:
+            self._update_winner()
+    
+    def _update_winner(self):
+        """
+        Recompute the winner and win_combo from the line counters (only needed after undoing a winning move).
+        """
+        self.winner = None
+        self.win_combo = []
+        for player_letter, offset in LINE_OFFSET.items():
+            for line in range(len(WIN_LINES)):
+                if self.line_counts[offset + line] == 3:
+                    self.winner = player_letter
+                    self.win_combo = list(WIN_LINES[line])
+                    return
 
     def wins(self, player_letter, state=None):
-        if state == None:
-            state = self.board_state # current state
-        
-        # All possible winning states
-        win_states = [
-            [(0, 0), (0, 1), (0, 2)],
-            [(1, 0), (1, 1), (1, 2)],
-            [(2, 0), (2, 1), (2, 2)],
-            [(0, 0), (1, 0), (2, 0)],
-            [(0, 1), (1, 1), (2, 1)],
-            [(0, 2), (1, 2), (2, 2)],
-            [(0, 0), (1, 1), (2, 2)],
-            [(2, 0), (1, 1), (0, 2)],
-        ]
+        if state is None or state is self.board_state:
+            return self.winner == player_letter
         
-        for win_state in win_states:
-            moves = set([state[x][y] for x, y in win_state])
-            if len(moves) == 1 and player_letter in moves:
-                self.win_combo = win_state
+        # Scan a GIVEN state that is not tracked by the counters
+        for win_state in WIN_LINES:
+            if all(state[x][y] == player_letter for x, y in win_state):
                 return True
         return False
 
     def game_over(self):
-        return self.wins('X') or self.wins('O') or len(self.empty_cells()) == 0
+        return self.winner is not None or self.num_moves == 9
     
     def restart(self):
         self.board_state = [[None, None, None], [None, None, None], [None, None, None]]
         self.last_move = (-1, -1)
         self.win_combo = []
         self.curr_player = 'X'
+        self.line_counts = [0] * (2 * len(WIN_LINES))
+        self.num_moves = 0
+        self.winner = None
+        self.state_id = 0
+        self.history = []
         
     def copy(self):
-        new_game = TicTacToe()
+        new_game = TicTacToe.__new__(TicTacToe)
         new_game.board_state = [row[:] for row in self.board_state]
         new_game.win_combo = self.win_combo.copy()
         new_game.curr_player = self.curr_player
+        new_game.line_counts = self.line_counts[:]
+        new_game.num_moves = self.num_moves
+        new_game.winner = self.winner
+        new_game.state_id = self.state_id
+        new_game.history = self.history[:]
         return new_game
     
     def __str__(self) -> str:
         return "Tic Tac Toe"
-        
\ No newline at end of file
+        
+
+#* Lookup tables for BitboardTicTacToe. Cell (x, y) is stored in bit 3*x + y.
+FULL_MASK = 0x1FF
+CELL_BITS = tuple(tuple(1 << (3 * x + y) for y in range(3)) for x in range(3))
+WIN_MASKS = tuple(sum(1 << (3 * x + y) for x, y in line) for line in WIN_LINES)
+# Index of the first completed line in WIN_LINES for every 9-bit board of one player (-1 if none)
+FIRST_WIN_LINE = tuple(next((i for i, mask in enumerate(WIN_MASKS) if bits & mask == mask), -1) for bits in range(FULL_MASK + 1))
+# State id contribution of every 9-bit board of one player with digit 1 (X); O boards count twice
+TERNARY = tuple(sum(3 ** (8 - i) for i in range(9) if bits >> i & 1) for bits in range(FULL_MASK + 1))
+# Empty cells for every 9-bit occupancy mask, in row-major order
+EMPTY_CELLS = tuple(tuple((i // 3, i % 3) for i in range(9) if not occupied >> i & 1) for occupied in range(FULL_MASK + 1))
+
+
+class BitboardTicTacToe(TicTacToe):
+    """
+    Tic Tac Toe stored as two 9-bit integers, one per player.
+    Wins, game over, empty cells and copy are table lookups and integer operations.
+    board_state is kept as a read-only list view so GamePlay and GameRender work unchanged.
+    """
+    def __init__(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        self.win_combo = []
+        self.curr_player = 'X'
+        self.history = []
+
+    @property
+    def board_state(self):
+        """
+        List of lists view of the board. Editing the returned lists does not change the game.
+        """
+        x_bits, o_bits = self.x_bits, self.o_bits
+        return [['X' if x_bits >> i & 1 else 'O' if o_bits >> i & 1 else None for i in range(row, row + 3)] for row in (0, 3, 6)]
+
+    @board_state.setter
+    def board_state(self, state):
+        self.x_bits = self._state_bits(state, 'X')
+        self.o_bits = self._state_bits(state, 'O')
+        self._update_win_combo()
+
+    @staticmethod
+    def _state_bits(state, player_letter):
+        bits = 0
+        for x in range(3):
+            for y in range(3):
+                if state[x][y] == player_letter:
+                    bits |= 1 << (3 * x + y)
+        return bits
+
+    def empty_cells(self, state=None):
+        if state is None:
+            occupied = self.x_bits | self.o_bits
+        else:
+            occupied = self._state_bits(state, 'X') | self._state_bits(state, 'O')
+        return list(EMPTY_CELLS[occupied])
+
+    def num_empty_cells(self):
+        return len(EMPTY_CELLS[self.x_bits | self.o_bits])
+
+    def valid_move(self, x, y):
+        return not (self.x_bits | self.o_bits) & CELL_BITS[x][y]
+
+    def set_move(self, x, y, player_letter):
+        assert self.curr_player == player_letter, f"Invalid player {player_letter}. Current player is {self.curr_player}"
+        bit = CELL_BITS[x][y]
+        if (self.x_bits | self.o_bits) & bit:
+            return False
+        if player_letter == 'X':
+            self.x_bits |= bit
+            bits = self.x_bits
+            self.curr_player = 'O'
+        else:
+            self.o_bits |= bit
+            bits = self.o_bits
+            self.curr_player = 'X'
+        # Record the first completed line, like TicTacToe.set_move()
+        if not self.win_combo and FIRST_WIN_LINE[bits] >= 0:
+            self.win_combo = list(WIN_LINES[FIRST_WIN_LINE[bits]])
+        return True
+
+    def push(self, x, y):
+        if self.set_move(x, y, self.curr_player):
+            self.history.append(3 * x + y)
+            return True
+        return False
+
+    def pop(self):
+        bit = 1 << self.history.pop()
+        if self.x_bits & bit:
+            self.x_bits ^= bit
+            self.curr_player = 'X'
+        else:
+            self.o_bits ^= bit
+            self.curr_player = 'O'
+        if self.win_combo:
+            self._update_win_combo()
+
+    def reset_move(self, x, y):
+        bit = CELL_BITS[x][y]
+        if self.x_bits & bit:
+            self.x_bits ^= bit
+            self.curr_player = 'X'
+        elif self.o_bits & bit:
+            self.o_bits ^= bit
+            self.curr_player = 'O'
+        else:
+            self.curr_player = None
+        if self.win_combo:
+            self._update_win_combo()
+
+    def _update_win_combo(self):
+        """
+        Recompute win_combo from the bitboards (only needed after undoing a move of a won game).
+        """
+        for bits in (self.x_bits, self.o_bits):
+            line = FIRST_WIN_LINE[bits]
+            if line >= 0:
+                self.win_combo = list(WIN_LINES[line])
+                return
+        self.win_combo = []
+
+    def wins(self, player_letter, state=None):
+        if state is None:
+            bits = self.x_bits if player_letter == 'X' else self.o_bits
+        else:
+            bits = self._state_bits(state, player_letter)
+        return FIRST_WIN_LINE[bits] >= 0
+
+    @property
+    def state_id(self):
+        return TERNARY[self.x_bits] + 2 * TERNARY[self.o_bits]
+
+    @property
+    def winner(self):
+        if FIRST_WIN_LINE[self.x_bits] >= 0:
+            return 'X'
+        if FIRST_WIN_LINE[self.o_bits] >= 0:
+            return 'O'
+        return None
+
+    def game_over(self):
+        x_bits, o_bits = self.x_bits, self.o_bits
+        return FIRST_WIN_LINE[x_bits] >= 0 or FIRST_WIN_LINE[o_bits] >= 0 or (x_bits | o_bits) == FULL_MASK
+
+    def restart(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        self.win_combo = []
+        self.curr_player = 'X'
+        self.history = []
+
+    def copy(self):
+        new_game = BitboardTicTacToe.__new__(BitboardTicTacToe)
+        new_game.x_bits = self.x_bits
+        new_game.o_bits = self.o_bits
+        new_game.win_combo = self.win_combo.copy()
+        new_game.curr_player = self.curr_player
+        new_game.history = self.history[:]
+        return new_game
+
+
+# Directions of the four lines through a cell: horizontal, vertical and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Gomoku(Game):
+    """
+    m,n,k game on a size x size board: the first player with k stones in a row wins.
+    Only the four lines through the last move are scanned for a win, and the empty cells are
+    maintained incrementally, so a move costs O(k) regardless of the board size.
+    """
+    def __init__(self, size: int = 15, k: int = 5):
+        assert size > 0 and 0 < k <= size, f"Invalid board size {size} and win length {k}"
+        self.size = size
+        self.k = k
+        self.board_state = [[None] * size for _ in range(size)]
+        self.win_combo = []
+        self.curr_player = 'X'
+        self.winner = None
+        #* Empty cells in row-major order (dict as an ordered set)
+        self.empty = dict.fromkeys((x, y) for x in range(size) for y in range(size))
+        #* Cells (size*x + y) played with push(), undone with pop()
+        self.history = []
+        self._win_move = None
+
+    def print_board(self):
+        print('    ' + ' '.join(f'{y:>2}' for y in range(self.size)))
+        for x, row in enumerate(self.board_state):
+            print(f'{x:>2}  ' + ' '.join(f'{cell if cell else ".":>2}' for cell in row))
+
+    def init_board(self):
+        print(f"\nGame board: {self.size}x{self.size}, {self.k} in a row wins. Moves are (row, column), starting from 0.\n")
+
+    def empty_cells(self, state=None):
+        if state is None:
+            return list(self.empty)
+        return [(x, y) for x in range(self.size) for y in range(self.size) if state[x][y] is None]
+
+    def num_empty_cells(self):
+        return len(self.empty)
+
+    def valid_move(self, x, y):
+        return 0 <= x < self.size and 0 <= y < self.size and self.board_state[x][y] is None
+
+    def set_move(self, x, y, player_letter):
+        assert self.curr_player == player_letter, f"Invalid player {player_letter}. Current player is {self.curr_player}"
+        if not self.valid_move(x, y):
+            return False
+        self.board_state[x][y] = player_letter
+        del self.empty[(x, y)]
+        self.curr_player = 'X' if player_letter == 'O' else 'O'
+        if self.winner is None:
+            line = self._line_through(x, y, player_letter)
+            if line:
+                self.winner = player_letter
+                self.win_combo = line
+                self._win_move = (x, y)
+        return True
+
+    def _line_through(self, x, y, player_letter):
+        """
+        Find a run of at least k stones of player_letter through (x, y).
+        :return: the cells of the run, or an empty list
+        """
+        board, size = self.board_state, self.size
+        for dx, dy in DIRECTIONS:
+            line = [(x, y)]
+            for sign in (1, -1):
+                i, j = x + sign * dx, y + sign * dy
+                while 0 <= i < size and 0 <= j < size and board[i][j] == player_letter:
+                    line.append((i, j))
+                    i, j = i + sign * dx, j + sign * dy
+            if len(line) >= self.k:
+                return sorted(line)
+        return []
+
+    def push(self, x, y):
+        if self.set_move(x, y, self.curr_player):
+            self.history.append(self.size * x + y)
+            return True
+        return False
+
+    def pop(self):
+        cell = self.history.pop()
+        self.reset_move(cell // self.size, cell % self.size)
+
+    def reset_move(self, x, y):
+        self.curr_player = self.board_state[x][y]
+        self.board_state[x][y] = None
+        self.empty[(x, y)] = None
+        # The game stops at the first win, so only undoing the winning move clears the winner
+        if self._win_move == (x, y):
+            self.winner = None
+            self.win_combo = []
+            self._win_move = None
+
+    def wins(self, player_letter, state=None):
+        if state is None or state is self.board_state:
+            return self.winner == player_letter
+        
+        # Scan a GIVEN state for a run of k stones
+        size, k = self.size, self.k
+        for x in range(size):
+            for y in range(size):
+                for dx, dy in DIRECTIONS:
+                    end_x, end_y = x + (k - 1) * dx, y + (k - 1) * dy
+                    if 0 <= end_x < size and 0 <= end_y < size and all(state[x + i * dx][y + i * dy] == player_letter for i in range(k)):
+                        return True
+        return False
+
+    def game_over(self):
+        return self.winner is not None or not self.empty
+
+    def restart(self):
+        self.board_state = [[None] * self.size for _ in range(self.size)]
+        self.win_combo = []
+        self.curr_player = 'X'
+        self.winner = None
+        self.empty = dict.fromkeys((x, y) for x in range(self.size) for y in range(self.size))
+        self.history = []
+        self._win_move = None
+
+    def copy(self):
+        new_game = Gomoku.__new__(Gomoku)
+        new_game.size = self.size
+        new_game.k = self.k
+        new_game.board_state = [row[:] for row in self.board_state]
+        new_game.win_combo = self.win_combo.copy()
+        new_game.curr_player = self.curr_player
+        new_game.winner = self.winner
+        new_game.empty = self.empty.copy()
+        new_game.history = self.history[:]
+        new_game._win_move = self._win_move
+        return new_game
+
+    def __str__(self) -> str:
+        return "Gomoku"
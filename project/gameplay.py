@@ -3,18 +3,55 @@ This module contains the GamePlay class which is responsible for running the gam
 """
 import time
 import threading
-from func_timeout import func_timeout, FunctionTimedOut
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from .player import Player
 from .game import Game
+from .results import ResultsWriter
+
+def format_stats(stats: dict) -> str:
+    """
+    Summary of the cumulative search statistics of a player: each counter per move, and nodes and simulations per second.
+    """
+    moves = stats['moves']
+    parts = [f"{key} {value / moves:.1f}/move" for key, value in stats.items() if key not in ('moves', 'time')]
+    for key in ('nodes', 'simulations'):
+        if stats.get(key) and stats.get('time'):
+            parts.append(f"{key} {stats[key] / stats['time']:.0f}/s")
+    return ", ".join(parts)
+
+def print_final_scoreboard(scores: List[Tuple[str, int]], num_games: int, move_times: Dict[str, Tuple[float, int]], total_time: float, search_stats: Optional[Dict[str, dict]] = None):
+    """
+    Print the final scores and time statistics of an evaluation.
+    :param scores: (player name, number of wins) of both players
+    :param move_times: total move duration and number of moves of each player name
+    :param total_time: duration of the whole evaluation in seconds
+    :param search_stats: cumulative search statistics of each player name (see Player.cumulative_stats()), if recorded
+    """
+    print("Final Scoreboard:")
+    for player, wins in scores:
+        print(f"{player} wins {wins}/{num_games} games")
+    
+    draw = num_games - sum(wins for _, wins in scores)
+    print(f"Draws {draw}/{num_games} games\n")
+    
+    for player, (total, count) in move_times.items():
+        avg_time_per_move = total / count if count else 0
+        print(f"{player} average move duration: {avg_time_per_move:.2f} seconds")
+
+    for player, stats in (search_stats or {}).items():
+        if stats.get('moves'):
+            print(f"{player} search: {format_stats(stats)}")
+
+    print(f"Total evaluation time: {total_time:.2f} seconds\n")
 
 class GamePlay():
-    def __init__(self, x_player: Player, o_player: Player, game: Game , mode: str = "plain", num_games: int = 1, timeout: Optional[int] = None):
+    def __init__(self, x_player: Player, o_player: Player, game: Game , mode: str = "plain", num_games: int = 1, timeout: Optional[int] = None, results: Optional[ResultsWriter] = None):
         """
         Three modes for visualization of the game:
         1. "silent": game play is not shown (Not available for Human Player)
         2. "plain": game play is shown in terminal
         3. "ui": game play is shown with GUI       
+        Games and moves of the "silent" and "plain" modes are logged to results, if given.
         """
         self.x_player = x_player
         self.o_player = o_player
@@ -24,6 +61,7 @@ class GamePlay():
         self.num_games = num_games
         self.score = {self.x_player: 0, self.o_player: 0}
         self.timeout = timeout
+        self.results = results
         
         if str(self.x_player) == 'Human Player' or str(self.o_player) == 'Human Player':
             self.delay = 0
@@ -41,6 +79,14 @@ class GamePlay():
         self.x_player.letter = 'X'
         self.o_player.letter = 'O'
         
+    def move_deadline(self) -> Optional[float]:
+        """
+        Deadline for the move of the current player, as a time.perf_counter() value. Human moves have no deadline.
+        """
+        if self.timeout is None or str(self.curr_player) == 'Human Player':
+            return None
+        return time.perf_counter() + self.timeout
+        
     def run(self):
         if self.mode == 'ui':
             self.run_ui_mode()
@@ -59,12 +105,14 @@ class GamePlay():
                 self.game.init_board()
                 self.game.print_board()
             
+            self.x_player.reset()
+            self.o_player.reset()
             num_moves = 0
             game_start_time = time.time()  # Start timing the game
             current_turn = 'X'
             winner = None
 
-            while len(self.game.empty_cells()) > 0:
+            while self.game.num_empty_cells() > 0:
                 if current_turn == 'X':
                     self.curr_player = self.x_player
                 else:
@@ -72,14 +120,11 @@ class GamePlay():
 
                 move_start_time = time.time()
                 
-                # Get move from current player. Set timeout for AI agent if specified
-                if self.timeout == None or str(self.curr_player) == 'Human Player':
-                    move = self.curr_player.get_move(self.game)
-                else:
-                    try:
-                        move = func_timeout(self.timeout, self.curr_player.get_move, args=(self.game,))
-                    except FunctionTimedOut:
-                        print(f"{self.curr_player} [{self.curr_player.letter}] move timed out!")
+                # Get move from current player. AI agents return their best move found by the deadline, if specified
+                deadline = self.move_deadline()
+                move = self.curr_player.get_move(self.game, deadline)
+                if deadline is not None and time.perf_counter() > deadline:
+                    print(f"{self.curr_player} [{self.curr_player.letter}] move exceeded the time limit!")
                         
                 move_end_time = time.time()
 
@@ -87,6 +132,9 @@ class GamePlay():
                 move_duration = move_end_time - move_start_time
                 num_moves += 1
                 move_times[str(self.curr_player)].append(move_duration)
+                if self.results is not None:
+                    stats = self.curr_player.last_move_stats() if self.curr_player.stats_enabled else None
+                    self.results.write_move(self.curr_game, num_moves, str(self.curr_player), self.curr_player.letter, move, move_duration, stats)
 
                 x, y = move[0], move[1]
 
@@ -105,6 +153,9 @@ class GamePlay():
 
             game_end_time = time.time()  # End timing the game
             game_duration = game_end_time - game_start_time
+            if self.results is not None:
+                self.results.write_game(self.curr_game, str(self.x_player), str(self.o_player), str(winner) if winner else None,
+                                        winner.letter if winner else None, num_moves, game_duration)
 
             if winner:
                 print(f"Game {self.curr_game} result: {winner} wins in {(num_moves+1)//2} moves!")
@@ -125,21 +176,14 @@ class GamePlay():
         total_evaluation_time = evaluation_end_time - evaluation_start_time
 
         # Print final scores and time statistics
-        print("Final Scoreboard:")
-        for player, wins in self.score.items():
-            print(f"{player} wins {wins}/{self.num_games} games")
-        
-        draw = self.num_games - sum(self.score.values())
-        print(f"Draws {draw}/{self.num_games} games\n")
-        
-        for player, times in move_times.items():
-            avg_time_per_move = sum(times) / len(times) if times else 0
-            print(f"{player} average move duration: {avg_time_per_move:.2f} seconds")
-
-        print(f"Total evaluation time: {total_evaluation_time:.2f} seconds\n")
+        scores = [(str(player), wins) for player, wins in self.score.items()]
+        search_stats = {str(player): player.cumulative_stats() for player in self.score if player.stats_enabled}
+        print_final_scoreboard(scores, self.num_games, {player: (sum(times), len(times)) for player, times in move_times.items()}, total_evaluation_time, search_stats)
     
     def run_ui_mode(self):
         self.ui = GameRender(gameplay=self)
+        self.x_player.reset()
+        self.o_player.reset()
         
         self.curr_player = self.x_player # X Player starts first
         self.ui.update_display(f"[{self.curr_player.letter}] {self.curr_player}'s turn", color="blue" if self.curr_player.letter == "X" else "green")
@@ -151,17 +195,10 @@ class GamePlay():
         
     def ai_turn(self):
         def ai_move():
-            if self.timeout is None:
-                move = self.curr_player.get_move(self.game)
-            else:
-                try:
-                    move = func_timeout(self.timeout, self.curr_player.get_move, args=(self.game,))
-                except FunctionTimedOut:
-                    print(f"{self.curr_player} [{self.curr_player.letter}] move timed out!")
-            
-            self.ui.after(self.delay, self._process_move(move[0], move[1]))
+            move = self.curr_player.get_move(self.game, self.move_deadline())
+            self.ui.after(self.delay, lambda: self._process_move(move[0], move[1]))
 
-        # Run the AI move calculation in a separate thread
+        # Run the AI move calculation in a separate thread, so the UI stays responsive
         ai_thread = threading.Thread(target=ai_move)
         ai_thread.start()
     
@@ -186,7 +223,7 @@ class GamePlay():
             
             # Delay before restarting or finishing the game
             self.ui.after(1000, self._check_game_continuation)
-        elif len(self.game.empty_cells()) == 0:
+        elif self.game.num_empty_cells() == 0:
             print(f"Game {self.curr_game} result: Draw!")
             print("--------------------------------------------------")
             self.ui.update_display("It's a draw", color="black")
@@ -211,6 +248,8 @@ class GamePlay():
         self.switch_players()
         self.game.restart()
         self.ui.reset_board()
+        self.x_player.reset()
+        self.o_player.reset()
         self.curr_game += 1
         
         self.curr_player = self.x_player # X Player starts first
@@ -0,0 +1,189 @@
+"""
+This module contains the headless match loop for bulk evaluations, shared with the tournament runner.
+
+Unlike GamePlay, it prints nothing until the final summary and keeps constant memory whatever the number of games:
+move durations are measured with time.perf_counter_ns() and summarized by StreamingStats.
+"""
+import math
+import random
+import time
+from typing import List, NamedTuple, Optional
+from .player import Player, add_stats
+from .game import Game
+from .gameplay import print_final_scoreboard
+from .results import ResultsWriter
+
+class StreamingStats():
+    """
+    Count, mean, minimum, maximum and approximate quantiles of a stream of positive values, in constant memory.
+    Quantiles come from a histogram with logarithmic buckets, so they are within relative_accuracy of the true value.
+    """
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        # Values up to 1 share the first bucket
+        key = math.ceil(math.log(value) / self.log_gamma) if value > 1 else 0
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: 'StreamingStats') -> None:
+        """
+        Add the values of another StreamingStats with the same relative accuracy.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: quantile between 0 and 1
+        :return: approximate value of the quantile, 0 if there are no values
+        """
+        if not self.count:
+            return 0
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Middle of the bucket (gamma^(key-1), gamma^key], clamped to the observed range
+                value = 2 * self.gamma ** key / (self.gamma + 1) if key > 0 else 1
+                return min(max(value, self.min), self.max)
+        return self.max
+
+class GameResult(NamedTuple):
+    game_index: int
+    winner: Optional[int]       # 0 for player 1, 1 for player 2, None for a draw
+    num_moves: int
+    x_index: int                # index of the 'X' player
+    duration: float             # seconds
+    move_stats: list            # StreamingStats of the move durations of each player, in nanoseconds
+    moves: list                 # (player index, move, duration in seconds, search statistics) of each move, if logged
+    search_stats: list          # search statistics of each player over the game, empty if not recorded
+
+def play_match(game: Game, players: List[Player], game_index: int, timeout: Optional[float], seed: int, log_moves: bool = False) -> GameResult:
+    """
+    Play game number game_index (from 1) between two players on the restarted game. Player 1 is 'X' in odd games,
+    as with GamePlay.switch_players(). The random module is seeded with seed + game_index and Player.clear()
+    reseeds the players, so the game does not depend on the games played before it.
+    :param timeout: time limit of each move in seconds, or None
+    :param log_moves: return the record of each move
+    """
+    random.seed(seed + game_index)
+    for i, player in enumerate(players):
+        player.clear(2 * (seed + game_index) + i)
+    order = (0, 1) if game_index % 2 == 1 else (1, 0)
+    players[order[0]].letter = 'X'
+    players[order[1]].letter = 'O'
+    for player in players:
+        player.reset()
+        player.reset_stats()
+    game.restart()
+    
+    move_stats = [StreamingStats(), StreamingStats()]
+    moves = []
+    game_start_time = time.perf_counter_ns()
+    num_moves = 0
+    winner = None
+    turn = 0
+    while game.num_empty_cells() > 0:
+        index = order[turn]
+        player = players[index]
+        move_start_time = time.perf_counter_ns()
+        deadline = None if timeout is None else move_start_time / 1e9 + timeout
+        move = player.get_move(game, deadline)
+        move_duration = time.perf_counter_ns() - move_start_time
+        move_stats[index].add(move_duration)
+        num_moves += 1
+        if log_moves:
+            moves.append((index, tuple(move), move_duration / 1e9, player.last_move_stats() if player.stats_enabled else None))
+        if not game.set_move(move[0], move[1], player.letter):
+            raise RuntimeError(f"The selected move {tuple(move)} from {player} is invalid. There is a bug in the code!")
+        if game.wins(player.letter):
+            winner = index
+            break
+        turn = 1 - turn
+    game_duration = (time.perf_counter_ns() - game_start_time) / 1e9
+    return GameResult(game_index, winner, num_moves, order[0], game_duration, move_stats, moves, [player.cumulative_stats() for player in players])
+
+class MatchSummary():
+    """
+    Totals of the games between two players: wins, move durations and search statistics, in constant memory.
+    """
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.wins = [0, 0]
+        self.num_games = 0
+        self.move_stats = [StreamingStats(), StreamingStats()]
+        self.search_stats = [{}, {}]
+
+    def add(self, result: GameResult, results: Optional[ResultsWriter] = None) -> None:
+        """
+        Add a game to the totals, and write its records to the results log, if any.
+        """
+        names = self.names
+        self.num_games += 1
+        if result.winner is not None:
+            self.wins[result.winner] += 1
+        for totals, stats in zip(self.move_stats, result.move_stats):
+            totals.merge(stats)
+        for totals, stats in zip(self.search_stats, result.search_stats):
+            add_stats(totals, stats)
+        if results is not None:
+            letters = ('X', 'O') if result.x_index == 0 else ('O', 'X')
+            for ply, (index, move, duration, stats) in enumerate(result.moves, 1):
+                results.write_move(result.game_index, ply, names[index], letters[index], move, duration, stats)
+            winner = result.winner
+            results.write_game(result.game_index, names[result.x_index], names[1 - result.x_index], None if winner is None else names[winner],
+                               None if winner is None else letters[winner], result.num_moves, result.duration)
+
+    def print(self, total_time: float, percentiles: bool = False) -> None:
+        """
+        Print the final scoreboard, with the move duration percentiles and games per second if percentiles is set.
+        """
+        print_final_scoreboard(list(zip(self.names, self.wins)), self.num_games,
+                               {name: (stats.total / 1e9, stats.count) for name, stats in zip(self.names, self.move_stats)}, total_time,
+                               {name: stats for name, stats in zip(self.names, self.search_stats) if stats})
+        if percentiles:
+            print("Move duration percentiles:")
+            for name, stats in zip(self.names, self.move_stats):
+                p50, p90, p99 = (stats.quantile(q) / 1e6 for q in (0.5, 0.9, 0.99))
+                print(f"{name}: p50 {p50:.3f} ms, p90 {p90:.3f} ms, p99 {p99:.3f} ms, max {stats.max / 1e6:.3f} ms")
+            print(f"Games per second: {self.num_games / total_time:.1f}\n")
+
+def run_headless(x_player: Player, o_player: Player, game: Game, num_games: int = 1, timeout: Optional[float] = None, results: Optional[ResultsWriter] = None, seed: Optional[int] = None):
+    """
+    Play num_games games with play_match(), alternating 'X' and 'O' between the players, and print the final summary.
+    :param timeout: time limit of each move in seconds, or None
+    :param results: log of the games and moves, if any
+    :param seed: seed of the games, random if None
+    :return: number of wins of each player
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    players = [x_player, o_player]
+    summary = MatchSummary([str(x_player), str(o_player)])
+    evaluation_start_time = time.perf_counter_ns()
+    for game_index in range(1, num_games + 1):
+        summary.add(play_match(game, players, game_index, timeout, seed, results is not None and results.log_moves), results)
+    summary.print((time.perf_counter_ns() - evaluation_start_time) / 1e9, percentiles=True)
+    return {x_player: summary.wins[0], o_player: summary.wins[1]}
@@ -0,0 +1,229 @@
+"""
+This module contains the rating ladder: a round robin between players of the project.Player factory, played in
+parallel, with Elo ratings and 95% confidence intervals fitted on all the games.
+
+Each pairing plays pairs of games, one with each player as 'X', until a sequential probability ratio test
+decides it. Two tests run side by side, H0: equal strength against H1: player 1 is stronger by elo_margin, and
+the same with player 2. A pairing stops as soon as either H1 is accepted, or both H0 are. Every pairing keeps
+its two games in flight, and submits the next two as soon as both are over, so workers never wait for the
+slowest pairing and decided pairings stop using games.
+
+Game seeds depend only on the pairing and the game number, play_match() clears the players before each game
+and the tests only look at whole pairs of games, so without a timeout the results do not depend on the number
+of workers. With a timeout, the depth reached by the searches also depends on the load of the machine.
+
+Usage: python -m project.ladder [-p PLAYER ...] [-w WORKERS] [--max_games N] [--elo_margin ELO] [-t TIMEOUT | -nt]
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from . import Game, Player
+from .headless import play_match
+
+PLAYERS = ['minimax', 'alphabeta', 'mcts', 'qlearning', 'oracle', 'random']
+DEFAULT_PLAYERS = ['minimax', 'alphabeta', 'mcts', 'qlearning', 'random']
+MAX_GAMES = 200
+ELO_MARGIN = 100
+ALPHA = 0.05
+BETA = 0.05
+# Virtual draws added to each pairing when fitting the ratings, so players that win or lose every game
+# still get finite ratings
+PRIOR_DRAWS = 1
+ELO_SCALE = 400 / math.log(10)
+
+# Game, settings and players of each pairing in a worker process, set by init_worker()
+_worker = {}
+
+def init_worker(game_args: dict, player_options: dict, timeout: Optional[float], seed: int):
+    _worker.update(game=Game(**game_args), player_options=player_options, timeout=timeout, seed=seed, players={})
+
+def play_pairing_game(pairing: int, names: Tuple[str, str], game_index: int):
+    """
+    Play game number game_index (from 1) of a pairing in the worker process. The players of each pairing are
+    built on their first game, and Q-Learning players load the tables saved by the parent.
+    :return: (pairing, winner: 0 for player 1, 1 for player 2, None for a draw)
+    """
+    game, players = _worker['game'], _worker['players']
+    if names not in players:
+        players[names] = Player(*names, **_worker['player_options'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            for player in players[names]:
+                if hasattr(player, 'load_or_train'):
+                    player.load_or_train(game)
+    # Seeds of different pairings do not overlap for up to 1000000 games
+    result = play_match(game, players[names], game_index, _worker['timeout'], _worker['seed'] + 1000000 * pairing)
+    return pairing, result.winner
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """
+    Log-likelihood ratio of H1: elo = elo1 against H0: elo = elo0, under the normal approximation of the mean
+    game score (1 for a win, 0.5 for a draw). One virtual win and one virtual loss are added to the variance, so
+    that a pairing with only draws, or only wins, is not judged on a variance of zero.
+    """
+    num_games = wins + draws + losses
+    if num_games == 0:
+        return 0.0
+    mean = (wins + 0.5 * draws) / num_games
+    variance = (wins * (1 - mean) ** 2 + draws * (0.5 - mean) ** 2 + losses * mean ** 2 + (1 - mean) ** 2 + mean ** 2) / (num_games + 2)
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return num_games * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+def sprt_decision(wins: int, draws: int, losses: int, elo_margin: float = ELO_MARGIN, alpha: float = ALPHA, beta: float = BETA) -> Optional[str]:
+    """
+    :return: 'player1' or 'player2' if one of them is stronger, 'equal' if neither is, None if undecided
+    """
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    player1 = sprt_llr(wins, draws, losses, 0, elo_margin)
+    player2 = sprt_llr(losses, draws, wins, 0, elo_margin)
+    if player1 >= upper:
+        return 'player1'
+    if player2 >= upper:
+        return 'player2'
+    if player1 <= lower and player2 <= lower:
+        return 'equal'
+    return None
+
+def fit_ratings(num_players: int, results: Dict[Tuple[int, int], List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit Bradley-Terry ratings on the results of the pairings, counting draws as half a win for each player.
+    :param results: [wins, draws, losses] of player i against player j, for i < j
+    :return: (Elo ratings with a mean of 0, half-width of their 95% confidence intervals)
+    """
+    games = np.zeros((num_players, num_players))
+    scores = np.zeros((num_players, num_players))
+    for (i, j), (wins, draws, losses) in results.items():
+        games[i, j] = games[j, i] = wins + draws + losses + PRIOR_DRAWS
+        scores[i, j] = wins + 0.5 * (draws + PRIOR_DRAWS)
+        scores[j, i] = losses + 0.5 * (draws + PRIOR_DRAWS)
+
+    # Minorization-maximization (Hunter, 2004) on the strengths gamma = exp(rating)
+    gamma = np.ones(num_players)
+    total_scores = scores.sum(axis=1)
+    for _ in range(10000):
+        updated = total_scores / (games / (gamma[:, None] + gamma[None, :])).sum(axis=1)
+        updated /= np.exp(np.log(updated).mean())
+        converged = np.allclose(updated, gamma, rtol=1e-10)
+        gamma = updated
+        if converged:
+            break
+    ratings = np.log(gamma)
+
+    # Covariance from the inverse of the Fisher information, with the sum of the ratings fixed
+    p = 1 / (1 + np.exp(ratings[None, :] - ratings[:, None]))
+    information = games * p * (1 - p)
+    information = np.diag(information.sum(axis=1)) - information
+    covariance = np.linalg.pinv(information)
+    return ratings * ELO_SCALE, 1.96 * np.sqrt(np.clip(np.diag(covariance), 0, None)) * ELO_SCALE
+
+def run_ladder(names: List[str], game_args: dict, player_options: dict, num_workers: int = 1, timeout: Optional[float] = None,
+               max_games: int = MAX_GAMES, elo_margin: float = ELO_MARGIN, alpha: float = ALPHA, beta: float = BETA, seed: Optional[int] = None):
+    """
+    Play every pairing of the players until its SPRT decides or it reaches max_games, then print the results
+    of the pairings and the ratings.
+    :param names: player names of the project.Player factory
+    :param player_options: other arguments of project.Player()
+    :param timeout: time limit of each move in seconds, or None
+    :param seed: ladder seed, random if None
+    :return: {player name: (Elo rating, half-width of its 95% confidence interval)}
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    # Train the Q-Learning tables once, before the workers load them
+    if 'qlearning' in names:
+        for player in Player('qlearning', 'qlearning', **player_options):
+            player.load_or_train(Game(**game_args))
+
+    pairings = list(itertools.combinations(range(len(names)), 2))
+    results = {pair: [0, 0, 0] for pair in pairings}
+    decisions = {pair: None for pair in pairings}
+    num_games = {pair: 0 for pair in pairings}
+    # Games of the current pair of each pairing that are not over yet
+    pending = {pair: 0 for pair in pairings}
+
+    def verdict(pair: Tuple[int, int]) -> str:
+        decision = decisions[pair]
+        if decision is None:
+            return "undecided"
+        if decision == 'equal':
+            return f"equal within {elo_margin:g} Elo"
+        return f"{names[pair[0]] if decision == 'player1' else names[pair[1]]} is stronger"
+
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker, initargs=(game_args, player_options, timeout, seed)) as pool:
+        def submit(index: int) -> set:
+            """
+            Submit the next two games of a pairing, one with each player as 'X'.
+            """
+            pair = pairings[index]
+            names_pair = (names[pair[0]], names[pair[1]])
+            num_games[pair] += 2
+            pending[pair] = 2
+            return {pool.submit(play_pairing_game, index, names_pair, game_index) for game_index in (num_games[pair] - 1, num_games[pair])}
+
+        in_flight = set()
+        for index in range(len(pairings)):
+            in_flight |= submit(index)
+        num_finished = 0
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, winner = future.result()
+                pair = pairings[index]
+                results[pair][{0: 0, None: 1, 1: 2}[winner]] += 1
+                pending[pair] -= 1
+                if pending[pair] > 0:
+                    continue
+                decisions[pair] = sprt_decision(*results[pair], elo_margin, alpha, beta)
+                if decisions[pair] is None and num_games[pair] < max_games:
+                    in_flight |= submit(index)
+                else:
+                    num_finished += 1
+                    print(f"{names[pair[0]]} vs {names[pair[1]]}: {verdict(pair)} after {num_games[pair]} games ({num_finished}/{len(pairings)} pairings)")
+
+    print("--------------------------------------------------")
+    print(f"{'Pairing':<34}{'W-D-L':>12}{'Games':>7}  Result")
+    for pair in pairings:
+        player1, player2 = names[pair[0]], names[pair[1]]
+        print(f"{player1 + ' vs ' + player2:<34}{'-'.join(map(str, results[pair])):>12}{num_games[pair]:>7}  {verdict(pair)}")
+    print(f"Total games: {sum(num_games.values())} (at most {max_games * len(pairings)} without early stopping)\n")
+
+    ratings, intervals = fit_ratings(len(names), results)
+    print(f"{'Player':<12}{'Elo':>8}{'95% CI':>10}")
+    for i in np.argsort(-ratings):
+        print(f"{names[i]:<12}{ratings[i]:>+8.0f}{'±':>4}{intervals[i]:>5.0f}")
+    return {names[i]: (float(ratings[i]), float(intervals[i])) for i in range(len(names))}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m project.ladder', description='Round-robin rating ladder of the Tic Tac Toe players')
+    parser.add_argument('--players', '-p', type=str, nargs='+', default=DEFAULT_PLAYERS, choices=PLAYERS, help='Players of the ladder')
+    parser.add_argument('--game', '-g', type=str, default='tictactoe', choices=['tictactoe', 'bitboard'], help='Game engine')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Number of processes playing the games')
+    parser.add_argument('--max_games', type=int, default=MAX_GAMES, help='Maximum number of games of a pairing')
+    parser.add_argument('--elo_margin', type=float, default=ELO_MARGIN, help='Elo difference that the SPRT of each pairing tests for')
+    parser.add_argument('--alpha', type=float, default=ALPHA, help='False positive rate of the SPRT')
+    parser.add_argument('--beta', type=float, default=BETA, help='False negative rate of the SPRT')
+    parser.add_argument('--timeout', '-t', type=int, default=10, help='Timeout for each move')
+    parser.add_argument('--no_timeout', '-nt', action='store_true', help='No timeout for each move')
+    parser.add_argument('--seed', type=int, default=None, help='Ladder seed')
+    parser.add_argument('--mcts_rollouts', type=int, default=1, help='Number of random playouts per expanded MCTS leaf')
+    parser.add_argument('--mcts_solver', action='store_true', help='Prove won, lost and drawn positions in MCTS')
+    parser.add_argument('--q_symmetric', action='store_true', help='Share Q-values between rotations and reflections of a board')
+    args = parser.parse_args()
+
+    if len(set(args.players)) < 2:
+        raise ValueError("The ladder needs at least two different players!")
+    if args.max_games < 2:
+        raise ValueError("Each pairing needs at least two games, one with each player as 'X'.")
+
+    player_options = dict(mcts_rollouts=args.mcts_rollouts, mcts_solver=args.mcts_solver, q_symmetric=args.q_symmetric)
+    run_ladder(list(dict.fromkeys(args.players)), dict(game=args.game), player_options, num_workers=args.workers,
+               timeout=None if args.no_timeout else args.timeout, max_games=args.max_games, elo_margin=args.elo_margin,
+               alpha=args.alpha, beta=args.beta, seed=args.seed)
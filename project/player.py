@@ -3,9 +3,22 @@ This module contains Generic Player class and Random Player class.
 """
 from .game import Game
 import random
-from typing import Union, List, Tuple
+from typing import Optional, Union, List, Tuple
 from abc import ABC, abstractmethod
 
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its deadline has passed, to unwind back to get_move.
+    """
+    pass
+
+def add_stats(total: dict, stats: dict) -> None:
+    """
+    Add the counters of stats to total, in place.
+    """
+    for key, value in stats.items():
+        total[key] = total.get(key, 0) + value
+
 class Player(ABC):
     def __init__(self, letter: str):
         """
@@ -14,16 +27,77 @@ class Player(ABC):
         """
         assert (letter.upper() == 'X' or letter.upper() == 'O'), "Letter can only be X or O!"
         self.letter = letter.upper()
+        #* Search statistics, recorded only after enable_stats()
+        self.stats_enabled = False
+        self._last_stats = {}
+        self._total_stats = {}
 
     @abstractmethod
-    def get_move(self, game: Game) -> Union[List[int], Tuple[int, int]]:
+    def get_move(self, game: Game, deadline: Optional[float] = None) -> Union[List[int], Tuple[int, int]]:
         """
         Given current state of the game, return the next move in the form of (x, y) coordinates.
+        Players check the deadline themselves and return their best move found so far once it has passed.
         :param game: Current game state
+        :param deadline: time.perf_counter() value by which the move is due, or None for no time limit
         :return: (x,y) or [x,y] as the selected move
         """
         pass
     
+    def reset(self) -> None:
+        """
+        Called before each new game. Players that keep state between moves clear it here.
+        """
+        pass
+    
+    def clear(self, seed: int) -> None:
+        """
+        Reseed the player's own random generators and forget what was kept from earlier games that could change
+        its moves (e.g. search trees), so that its next game only depends on seed and the random module. Caches
+        that only speed up the search, like the alpha-beta transposition table, are kept. Players without such
+        state have nothing to do.
+        """
+        pass
+    
+    def enable_stats(self, enabled: bool = True) -> None:
+        """
+        Turn the recording of search statistics on or off. Players check stats_enabled once per move, so
+        statistics cost nothing while disabled.
+        """
+        self.stats_enabled = enabled
+    
+    def record_stats(self, **stats) -> None:
+        """
+        Record the statistics of the move just chosen. Players call it at the end of get_move() when stats_enabled
+        is set, with the counters they keep: nodes, cutoffs, tt_hits, simulations, tree_nodes, depth, table_hits, and
+        time (seconds spent in get_move).
+        """
+        self._last_stats = stats
+        add_stats(self._total_stats, stats)
+        self._total_stats['moves'] = self._total_stats.get('moves', 0) + 1
+    
+    def skip_stats(self) -> None:
+        """
+        Record a move that was not searched, e.g. a random opening move. It has no statistics and is left out
+        of the cumulative statistics, so that it does not lower their per-move averages.
+        """
+        self._last_stats = {}
+    
+    def last_move_stats(self) -> dict:
+        """
+        Statistics of the last move, empty if none were recorded.
+        """
+        return dict(self._last_stats)
+    
+    def cumulative_stats(self) -> dict:
+        """
+        Sum of the statistics of the moves since the last reset_stats(), with their number in 'moves'.
+        """
+        return dict(self._total_stats)
+    
+    def reset_stats(self) -> None:
+        self._last_stats = {}
+        self._total_stats = {}
+    
     @abstractmethod
     def __str__(self) -> str:
         """
@@ -36,7 +110,7 @@ class RandomPlayer(Player):
     def __init__(self, letter):
         super().__init__(letter)
 
-    def get_move(self, game):
+    def get_move(self, game, deadline=None):
         move = random.choice(game.empty_cells())
         return move
     
@@ -0,0 +1,119 @@
+"""
+This module contains the profiler of main.py --profile, which attributes time or memory to each player.
+
+Only the phases of interest are profiled: the get_move calls of each player, wrapped by Profiler.wrap(), and blocks
+such as Q-Learning training run in Profiler.phase(). Frames of the UI, progress bars and the main loop are never
+recorded. Work done in worker processes (--mcts_workers, --q_workers) is not seen by the profiler.
+"""
+import contextlib
+import cProfile
+import io
+import pstats
+import re
+import time
+import tracemalloc
+from collections import Counter
+from .player import Player
+
+# Number of functions or allocation sites shown per phase
+TOP = 15
+
+def format_size(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+class Profiler():
+    def __init__(self, kind: str, output: str = 'profile'):
+        """
+        :param kind: 'cpu' to profile with cProfile, 'mem' to trace allocations with tracemalloc
+        :param output: prefix of the report files: <output>.txt, and <output>-<phase>.pstats for 'cpu'
+        """
+        if kind not in ('cpu', 'mem'):
+            raise ValueError("Invalid profile. Please choose between 'cpu' and 'mem'")
+        self.kind = kind
+        self.output = output
+        #* Per phase: calls and total time, then a cProfile.Profile ('cpu') or peak and allocation sites ('mem')
+        self.calls = Counter()
+        self.times = Counter()
+        self.profiles = {}
+        self.peaks = Counter()
+        self.sites = {}
+        if kind == 'mem':
+            tracemalloc.start()
+            # Allocations of the profiler itself are left out of the reports
+            self.filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Profile the block as part of the phase called name. Phases must not be nested.
+        """
+        start_time = time.perf_counter()
+        if self.kind == 'cpu':
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+        else:
+            before = tracemalloc.take_snapshot().filter_traces(self.filters)
+            tracemalloc.reset_peak()
+            start_size = tracemalloc.get_traced_memory()[0]
+            try:
+                yield
+            finally:
+                peak = tracemalloc.get_traced_memory()[1] - start_size
+                self.peaks[name] = max(self.peaks[name], peak)
+                # Memory allocated by the block and still held at its end, by line
+                after = tracemalloc.take_snapshot().filter_traces(self.filters)
+                sites = self.sites.setdefault(name, Counter())
+                for stat in after.compare_to(before, 'lineno'):
+                    if stat.size_diff > 0:
+                        sites[str(stat.traceback)] += stat.size_diff
+        self.calls[name] += 1
+        self.times[name] += time.perf_counter() - start_time
+
+    def wrap(self, player: Player, label: str) -> None:
+        """
+        Profile every get_move call of the player as the phase '<label> <player> get_move'.
+        """
+        get_move = player.get_move
+        name = f"{label} {player} get_move"
+
+        def profiled_get_move(game, deadline=None):
+            with self.phase(name):
+                return get_move(game, deadline)
+
+        player.get_move = profiled_get_move
+
+    def report(self) -> str:
+        """
+        Write the report files and return the text report.
+        """
+        lines = [f"{'CPU' if self.kind == 'cpu' else 'Memory'} profile"]
+        for name in self.calls:
+            lines.append(f"\n== {name}: {self.calls[name]} calls, {self.times[name]:.3f} seconds ==")
+            if self.kind == 'cpu':
+                path = f"{self.output}-{re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower()}.pstats"
+                self.profiles[name].dump_stats(path)
+                stream = io.StringIO()
+                stats = pstats.Stats(self.profiles[name], stream=stream)
+                stats.strip_dirs().sort_stats('tottime').print_stats(TOP)
+                lines.append(f"Saved to {path}")
+                # Drop the header of pstats, which repeats the total time
+                lines.append(stream.getvalue()[stream.getvalue().find('   ncalls'):].rstrip())
+            else:
+                lines.append(f"Peak allocation of a call: {format_size(self.peaks[name])}")
+                lines.append("Memory still held after the calls, by allocation site:")
+                for site, size in self.sites[name].most_common(TOP):
+                    lines.append(f"    {format_size(size):>12}  {site}")
+        text = "\n".join(lines) + "\n"
+        with open(f"{self.output}.txt", 'w') as f:
+            f.write(text)
+        if self.kind == 'mem':
+            tracemalloc.stop()
+        return text
@@ -0,0 +1,73 @@
+"""
+This module contains the results log of an evaluation: one record per game and, optionally, one per move.
+
+The format follows the file extension: JSON Lines for .jsonl, otherwise CSV with one column per field.
+Records go through a buffered file and are flushed every FLUSH_INTERVAL records, so memory does not grow
+with the number of games. Only one process should write a log: the tournament workers send their records
+to the parent.
+"""
+import csv
+import json
+from typing import Optional, Sequence
+
+FLUSH_INTERVAL = 1000
+FIELDS = ('record', 'game', 'player_x', 'player_o', 'ply', 'player', 'letter', 'move', 'duration', 'winner', 'winner_letter', 'num_moves', 'stats')
+
+class ResultsWriter():
+    def __init__(self, path: str, log_moves: bool = False, flush_interval: int = FLUSH_INTERVAL):
+        """
+        :param path: output file, .jsonl for JSON Lines, otherwise CSV
+        :param log_moves: also write one record per move
+        :param flush_interval: number of records between flushes
+        """
+        self.path = path
+        self.log_moves = log_moves
+        self.flush_interval = flush_interval
+        self.jsonl = path.endswith('.jsonl')
+        self.file = open(path, 'w', newline='')
+        if not self.jsonl:
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            self.writer.writeheader()
+        self.num_records = 0
+
+    def write_move(self, game: int, ply: int, player: str, letter: str, move: Sequence[int], duration: float, stats: Optional[dict] = None) -> None:
+        """
+        Write the record of a move, if moves are logged.
+        :param game: game index, from 1
+        :param ply: move number in the game, from 1
+        :param duration: move duration in seconds
+        :param stats: search statistics of the move, if any
+        """
+        if self.log_moves:
+            self._write({'record': 'move', 'game': game, 'ply': ply, 'player': player, 'letter': letter,
+                         'move': [int(move[0]), int(move[1])], 'duration': duration, 'stats': stats})
+
+    def write_game(self, game: int, player_x: str, player_o: str, winner: Optional[str], winner_letter: Optional[str], num_moves: int, duration: float) -> None:
+        """
+        Write the record of a finished game.
+        :param winner: name of the winner, None for a draw
+        :param duration: game duration in seconds
+        """
+        self._write({'record': 'game', 'game': game, 'player_x': player_x, 'player_o': player_o, 'winner': winner,
+                     'winner_letter': winner_letter, 'num_moves': num_moves, 'duration': duration})
+
+    def _write(self, record: dict) -> None:
+        if self.jsonl:
+            self.file.write(json.dumps(record) + '\n')
+        else:
+            for key in ('move', 'stats'):
+                if record.get(key) is not None:
+                    record[key] = json.dumps(record[key])
+            self.writer.writerow(record)
+        self.num_records += 1
+        if self.num_records % self.flush_interval == 0:
+            self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> 'ResultsWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
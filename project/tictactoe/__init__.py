@@ -5,4 +5,5 @@ from .alphabeta import TTT_AlphaBetaPlayer
 from .human import TTT_HumanPlayer
 from .minimax import TTT_MinimaxPlayer
 from .mcts import TTT_MCTSPlayer
-from .q_learning import TTT_QPlayer
\ No newline at end of file
+from .q_learning import TTT_QPlayer
+from .oracle import TTT_OraclePlayer
\ No newline at end of file
@@ -1,62 +1,187 @@
 import random
 import math
-from ..player import Player
-from ..game import TicTacToe
+import time
+from ..player import Player, SearchTimeout
+from ..game import TicTacToe, CELLS
+from .transposition import TranspositionTable, symmetry_keys, update_keys, EXACT, LOWER, UPPER, DEFAULT_TT_SIZE
+from .move_ordering import MoveOrdering
+from .minimax import NODE_CHECK_INTERVAL
+
+# Depth stored for transposition table entries whose subtree was searched to the end of the game
+SOLVED_DEPTH = 99
 
 class TTT_AlphaBetaPlayer(Player):
-    def __init__(self, letter):
+    def __init__(self, letter, tt_size=DEFAULT_TT_SIZE, ordering=None):
+        """
+        :param letter: X or O
+        :param tt_size: maximum number of transposition table entries (0 disables the table)
+        :param ordering: MoveOrdering used to sort moves (default: all heuristics enabled)
+        """
         super().__init__(letter)
+        #* The transposition table persists across moves and games
+        self.tt = TranspositionTable(tt_size) if tt_size else None
+        self.ordering = ordering if ordering is not None else MoveOrdering()
+        self.nodes = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self._keys = None
+        self._root_depth = 0
+        self._deadline = None
+        self._depth_limited = False
 
-    def get_move(self, game: TicTacToe):
-        depth = len(game.empty_cells())
+    def get_move(self, game: TicTacToe, deadline=None):
+        depth = game.num_empty_cells()
         if depth == 0 or game.game_over():
             return
         
-        if len(game.empty_cells()) == 9:
+        start_time = time.perf_counter() if self.stats_enabled else None
+        tt_hits = self.tt.hits if self.tt is not None else 0
+        self.nodes = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        if depth == 9:
             move = random.choice(game.empty_cells())
         else:
-            # Alpha-Beta Pruning: Initialize alpha to negative infinity and beta to positive infinity
-            alpha = -math.inf
-            beta = math.inf
-            choice = self.minimax(game, depth, self.letter, alpha, beta)
-            move = [choice[0], choice[1]]
+            # Search on a single copy of the game with push/pop, so no node allocates a new board
+            search_game = game.copy()
+            search_game.curr_player = self.letter
+            self._keys = symmetry_keys(search_game.board_state)
+            self.nodes = 1
+            self._deadline = deadline
+            self.ordering.new_search()
+            
+            # Without a deadline, search the full depth at once. Otherwise deepen iteratively and keep
+            # the move of the deepest completed search when time runs out.
+            move = list(search_game.empty_cells()[0])
+            for max_depth in (range(depth, depth + 1) if deadline is None else range(1, depth + 1)):
+                self._depth_limited = False
+                try:
+                    move = self._search_root(search_game, max_depth)
+                except SearchTimeout:
+                    break
+                self.depth_reached = max_depth
+                if not self._depth_limited:
+                    break # Every line reached the end of the game, deeper searches give the same move
+        if self.stats_enabled:
+            if depth == 9:
+                self.skip_stats()
+            else:
+                tt_hits = self.tt.hits - tt_hits if self.tt is not None else 0
+                self.record_stats(nodes=self.nodes, cutoffs=self.cutoffs, tt_hits=tt_hits, depth=self.depth_reached, time=time.perf_counter() - start_time)
+        return move
+
+    def _search_root(self, game: TicTacToe, depth: int):
+        """
+        Search every move of the current game state to the given depth.
+        :return: [row, col] of the best move
+        """
+        # Alpha-Beta Pruning: Initialize alpha to negative infinity and beta to positive infinity
+        alpha = -math.inf
+        beta = math.inf
+        self._root_depth = depth
+        next_letter = 'O' if self.letter == 'X' else 'X'
+        move = None
+        ordering = self.ordering
+        moves = ordering.moves[0]
+        # Root moves in static order: the first move of the best value is played, so the move does not depend on
+        # the transposition table and history scores kept from earlier searches and games
+        for i in range(ordering.order(game, 0, dynamic=False)):
+            cell = moves[i]
+            x, y = CELLS[cell]
+            self._push(game, x, y, self.letter)
+            score = self.minimax(game, depth - 1, next_letter, alpha, beta)
+            self._pop(game, x, y, self.letter)
+            if self.letter == 'X':
+                if score > alpha:
+                    alpha = score
+                    move = [x, y]
+            else:
+                if score < beta:
+                    beta = score
+                    move = [x, y]
         return move
 
-    def minimax(self, game: TicTacToe, depth: int, player_letter: str, alpha: float, beta: float):
+    def minimax(self, game: TicTacToe, depth: int, player_letter: str, alpha: float, beta: float) -> float:
         """
-        AI function that chooses the best move with alpha-beta pruning.
+        AI function that scores the current game state with alpha-beta pruning.
+        The game is searched in place with push/pop and restored on return.
+        Results are stored in the transposition table. Moves are sorted by the move ordering layer, with the
+        stored best move first, and the search of a node stops as soon as alpha >= beta.
         :param game: current game state
         :param depth: node index in the tree (0 <= depth <= 9)
-        :param player_letter: value representing the player
+        :param player_letter: value representing the player to move
         :param alpha: best value that the maximizer can guarantee
         :param beta: best value that the minimizer can guarantee
-        :return: (row, col) of the selected move
+        :return: alpha for the maximizer ('X') or beta for the minimizer ('O')
         """ 
-        if depth == 0 or game.game_over():
-            return [None, None, self.evaluate(game)]
-        best = [None, None]
-        for empty_cell in game.empty_cells(state=game.board_state):
-            x, y = empty_cell[0], empty_cell[1]
-            newgame = game.copy()
-            newgame.curr_player = player_letter
-            newgame.set_move(x, y, player_letter)
-            new_player_letter = 'X'
-            if player_letter == 'X':
-                new_player_letter = 'O'
-            score = self.minimax(newgame, depth - 1, new_player_letter, alpha, beta)
-            score[0], score[1] = x, y
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes % NODE_CHECK_INTERVAL and time.perf_counter() >= self._deadline:
+            raise SearchTimeout
+        if game.game_over():
+            return self.evaluate(game)
+        if depth == 0:
+            self._depth_limited = True
+            return self.evaluate(game)
+        
+        keys = self._keys
+        tt_cell = None
+        if self.tt is not None:
+            entry, g = self.tt.lookup(keys)
+            if entry is not None:
+                value, bound, entry_depth, _ = entry
+                if entry_depth >= depth:
+                    if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+                        if entry_depth < SOLVED_DEPTH:
+                            self._depth_limited = True
+                        return value
+                tt_cell = self.tt.best_cell(entry, g)
+        
+        alpha_orig, beta_orig = alpha, beta
+        limited_before, self._depth_limited = self._depth_limited, False
+        ply = self._root_depth - depth
+        next_letter = 'O' if player_letter == 'X' else 'X'
+        best_cell = None
+        ordering = self.ordering
+        moves = ordering.moves[ply]
+        for i in range(ordering.order(game, ply, tt_cell)):
+            cell = moves[i]
+            x, y = CELLS[cell]
+            self._push(game, x, y, player_letter)
+            score = self.minimax(game, depth - 1, next_letter, alpha, beta)
+            self._pop(game, x, y, player_letter)
             if player_letter == 'X':
-                if score[2] > alpha:
-                    alpha = score[2]
-                    best = [x, y]
+                if score > alpha:
+                    alpha = score
+                    best_cell = cell
             else:
-                if score[2] < beta:
-                    beta = score[2]
-                    best = [x, y]
-        if player_letter == 'X':
-            return [best[0], best[1], alpha]
+                if score < beta:
+                    beta = score
+                    best_cell = cell
+            if alpha >= beta:
+                self.cutoffs += 1
+                ordering.cutoff(cell, ply, depth)
+                break
+        
+        value = alpha if player_letter == 'X' else beta
+        if value <= alpha_orig:
+            bound = UPPER
+        elif value >= beta_orig:
+            bound = LOWER
         else:
-            return [best[0], best[1], beta]
+            bound = EXACT
+        if self.tt is not None:
+            # Results that never hit the depth limit hold for any depth
+            self.tt.store(keys, value, bound, depth if self._depth_limited else SOLVED_DEPTH, best_cell)
+        self._depth_limited = self._depth_limited or limited_before
+        return value
+    
+    def _push(self, game: TicTacToe, x: int, y: int, player_letter: str):
+        game.push(x, y)
+        update_keys(self._keys, player_letter, 3 * x + y)
+    
+    def _pop(self, game: TicTacToe, x: int, y: int, player_letter: str):
+        game.pop()
+        update_keys(self._keys, player_letter, 3 * x + y)
     
     def evaluate(self, game: TicTacToe) -> int:
         """
@@ -64,14 +189,12 @@ class TTT_AlphaBetaPlayer(Player):
         :param game: the game state to evaluate
         :return: the score of the board from the perspective of current player
         """
-        score = 0
-        if game.wins('X'):
-            score = 1
-        elif game.wins('O'):
-            score = -1
-        else:
-            score = 0
-        return score
+        winner = game.winner
+        if winner == 'X':
+            return 1
+        elif winner == 'O':
+            return -1
+        return 0
     
     def __str__(self) -> str:
         return "Alpha-Beta Player"
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""
+Build step for the perfect-play oracle table used by TTT_OraclePlayer.
+Usage: python -m project.tictactoe.build_oracle [--output PATH]
+"""
+import argparse
+import numpy as np
+from .oracle import build_oracle_table, ORACLE_PATH, REACHABLE
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the Tic Tac Toe oracle table')
+    parser.add_argument('--output', '-o', type=str, default=ORACLE_PATH, help='Output file')
+    args = parser.parse_args()
+
+    table = build_oracle_table(args.output)
+    print(f"Wrote {int(np.count_nonzero(table & REACHABLE))} reachable positions to {args.output}")
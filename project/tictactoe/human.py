@@ -8,7 +8,7 @@ class TTT_HumanPlayer(Player):
     def __init__(self, letter):
         super().__init__(letter)
     
-    def get_move(self, game):
+    def get_move(self, game, deadline=None):
         # Dictionary of valid moves
         move = -1
         moves = {
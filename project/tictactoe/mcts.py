@@ -1,110 +1,672 @@
 import numpy as np
 import random
 import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util
 
 from ..player import Player
-from ..game import TicTacToe
-
-from copy import deepcopy
+from ..game import Game, PLAYER_DIGITS, FULL_MASK, FIRST_WIN_LINE
+from .rollout import RolloutEngine, encode
 
+# Proven values, for the player who moved into the node
 WIN = 1
 LOSE = -1
 DRAW = 0
 NUM_SIMULATIONS = 5000
+INITIAL_CAPACITY = 4096
+EXPLORATION = math.sqrt(2)
+
+# Worker pools of the parallel mode, shared by all players of the process and keyed by number of workers
+_pools = {}
+# Process that owns the pools in _pools
+_pools_pid = None
+
+def get_pool(num_workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool with num_workers workers, created on first use and reused across moves and games.
+    Pools belong to the process that created them and cannot be used from another process: the worker processes
+    of the tournament and the ladder do not share the pools of the parent, each of them creates its own, so a
+    tournament runs workers * num_workers search processes. The pools are shut down by a multiprocessing
+    finalizer, which also runs when such a worker exits, unlike atexit handlers.
+    """
+    global _pools_pid
+    if _pools_pid != os.getpid():
+        # Pools copied from the parent by fork belong to the parent
+        _pools.clear()
+        _pools_pid = os.getpid()
+        # Runs before multiprocessing joins the child processes at exit, which would wait forever for idle workers,
+        # and before the queues of the pools are closed (priority 10), which would drop the shutdown messages
+        util.Finalize(None, shutdown_pools, exitpriority=100)
+    if num_workers not in _pools:
+        _pools[num_workers] = ProcessPoolExecutor(max_workers=num_workers)
+    return _pools[num_workers]
+
+def shutdown_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
+
+# Rollout engines of the batched simulations, keyed by (board size, k)
+_engines = {}
+
+def get_engine(size: int, k: int) -> RolloutEngine:
+    if (size, k) not in _engines:
+        _engines[(size, k)] = RolloutEngine(size, k)
+    return _engines[(size, k)]
+
+# Player codes stored in the tree
+PLAYER_CODES = {'X': 0, 'O': 1}
+NO_WINNER = -1
+# Empty cells (3*x + y) of every 9-bit occupancy mask of a 3x3 board, for the bitboard search
+EMPTY_MOVES = tuple(tuple(i for i in range(9) if not occupied >> i & 1) for occupied in range(FULL_MASK + 1))
+
+class MCTSTree():
+    """
+    Monte Carlo search tree stored as a struct of preallocated NumPy arrays, one entry per node.
+    The children of a node are stored next to each other: first_child[i] ... first_child[i] + num_children[i] - 1.
+    Nodes only store the move leading to them; game states are rebuilt by playing the moves during descent.
+    In solver mode, nodes of the same position share one block of children (see share()), so the tree is a DAG:
+    parent[] is then only the first parent, and results are backpropagated along the path of the simulation.
+    """
+    ARRAYS = ('N', 'Q', 'mean', 'inv_sqrt_N', 'parent', 'first_child', 'num_children', 'move', 'player', 'solved', 'value')
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.capacity = capacity
+        self.N = np.zeros(capacity, dtype=np.int64)              # visits
+        self.Q = np.zeros(capacity, dtype=np.float64)            # simulations not lost by the player who moved into the node
+        self.mean = np.zeros(capacity, dtype=np.float64)         # Q / N, cached for UCB1
+        self.inv_sqrt_N = np.zeros(capacity, dtype=np.float64)   # 1 / sqrt(N), cached for UCB1
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.num_children = np.zeros(capacity, dtype=np.int32)
+        self.move = np.full(capacity, -1, dtype=np.int32)        # cell (size*x + y) of the move leading to the node
+        self.player = np.zeros(capacity, dtype=np.int8)          # player to move at the node (PLAYER_CODES)
+        self.solved = np.zeros(capacity, dtype=np.bool_)         # game-theoretic value is proven
+        self.value = np.zeros(capacity, dtype=np.int8)           # proven value (WIN, DRAW, LOSE) for the player who moved into the node
+        self.num_nodes = 0
+        #* Expanded node of each position, keyed by state id (solver mode)
+        self.transpositions = {}
+
+    def reset(self, player_letter: str) -> int:
+        """
+        Clear the tree and create a root where player_letter is to move.
+        :return: index of the root
+        """
+        self.num_nodes = 0
+        self.transpositions.clear()
+        return self._allocate(1, -1, np.full(1, -1), PLAYER_CODES[player_letter])
+
+    def _allocate(self, count: int, parent: int, moves, player: int) -> int:
+        """
+        Append count nodes with the given parent, moves and player to move.
+        :return: index of the first new node
+        """
+        start = self.num_nodes
+        end = start + count
+        if end > self.capacity:
+            self._grow(end)
+        self.N[start:end] = 0
+        self.Q[start:end] = 0
+        self.mean[start:end] = 0
+        self.inv_sqrt_N[start:end] = 0
+        self.parent[start:end] = parent
+        self.first_child[start:end] = -1
+        self.num_children[start:end] = 0
+        self.move[start:end] = moves
+        self.player[start:end] = player
+        self.solved[start:end] = False
+        self.value[start:end] = DRAW
+        self.num_nodes = end
+        return start
+
+    def _grow(self, min_capacity: int) -> None:
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.capacity] = array
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def compact(self, root: int) -> int:
+        """
+        Keep only the nodes reachable from root, moved to the front of the arrays with root first, so that the
+        nodes of the subtrees left behind by a new root are reused instead of piling up.
+        Blocks of children shared by several nodes (solver mode) are moved once and stay shared.
+        :return: index of the root, 0
+        """
+        new_index = np.full(self.num_nodes, -1, dtype=np.int64)
+        new_index[root] = 0
+        kept = [np.array([root])]
+        count = 1
+        frontier = kept[0]
+        while frontier.size:
+            expanded = frontier[self.num_children[frontier] > 0]
+            firsts, unique = np.unique(self.first_child[expanded], return_index=True)
+            sizes = self.num_children[expanded][unique]
+            moved = new_index[firsts] < 0
+            if not moved.any():
+                break
+            frontier = np.concatenate([np.arange(first, first + size) for first, size in zip(firsts[moved], sizes[moved])])
+            new_index[frontier] = np.arange(count, count + frontier.size)
+            count += frontier.size
+            kept.append(frontier)
+        
+        kept = np.concatenate(kept)
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            array[:count] = array[kept]
+        first_child, parent = self.first_child[:count], self.parent[:count]
+        expanded = first_child >= 0
+        first_child[expanded] = new_index[first_child[expanded]]
+        # Backpropagation stops at the root, and at first parents that were dropped
+        linked = parent >= 0
+        parent[linked] = new_index[parent[linked]]
+        parent[0] = -1
+        self.num_nodes = count
+        self.transpositions = {state_id: int(new_index[node]) for state_id, node in self.transpositions.items() if new_index[node] >= 0}
+        return 0
+
+    def expand(self, node: int, cells, size: int) -> int:
+        """
+        Add one child per empty cell of the node.
+        :param cells: empty cells (x, y) of the node's state
+        :param size: board size, to encode cells as size*x + y
+        :return: index of the first child
+        """
+        return self.expand_moves(node, [size * x + y for x, y in cells])
+
+    def expand_moves(self, node: int, moves) -> int:
+        """
+        expand() with the empty cells already encoded as size*x + y.
+        :return: index of the first child
+        """
+        first = self._allocate(len(moves), node, moves, 1 - self.player[node])
+        self.first_child[node] = first
+        self.num_children[node] = len(moves)
+        return first
+
+    def share(self, node: int, other: int) -> None:
+        """
+        Give the node the children of other, an expanded node of the same position.
+        """
+        self.first_child[node] = self.first_child[other]
+        self.num_children[node] = self.num_children[other]
+
+    def best_child(self, node: int, c: float = EXPLORATION) -> int:
+        """
+        Child with the highest UCB1 value. Unvisited children come first, in order.
+        """
+        first = self.first_child[node]
+        end = first + self.num_children[node]
+        visits = self.N[first:end]
+        least_visited = int(visits.argmin())
+        if visits[least_visited] == 0:
+            return first + least_visited
+        ucb = self.mean[first:end] + (c * math.sqrt(math.log(self.N[node]))) * self.inv_sqrt_N[first:end]
+        return first + int(ucb.argmax())
+
+    def best_unsolved_child(self, node: int, c: float = EXPLORATION) -> int:
+        """
+        Child with the highest UCB1 value among the children not proven yet. Unvisited children come first, in order.
+        A node reached through a transposition may have visited children before its own first visit.
+        Proven children are not selected: their value is known, and a proven draw, which scores like a win, would
+        otherwise take most of the simulations and leave its siblings unproven. An unproven node always has an
+        unproven child, see solve().
+        """
+        first = self.first_child[node]
+        end = first + self.num_children[node]
+        solved = self.solved[first:end]
+        unvisited = (self.N[first:end] == 0) & ~solved
+        if unvisited.any():
+            return first + int(unvisited.argmax())
+        ucb = self.mean[first:end] + (c * math.sqrt(math.log(max(self.N[node], 1)))) * self.inv_sqrt_N[first:end]
+        ucb[solved] = -np.inf
+        return first + int(ucb.argmax())
+
+    def solve(self, node: int) -> bool:
+        """
+        Prove the node from its children: it is lost for the player who moved into it if one child is a proven win
+        for the player to move, otherwise its value is known once all of its children are proven.
+        :return: True if the node is proven
+        """
+        if self.solved[node]:
+            return True
+        first = self.first_child[node]
+        if first < 0:
+            return False
+        end = first + self.num_children[node]
+        solved, value = self.solved[first:end], self.value[first:end]
+        if (solved & (value == WIN)).any():
+            self.value[node] = LOSE
+        elif solved.all():
+            self.value[node] = -int(value.max())
+        else:
+            return False
+        self.solved[node] = True
+        return True
+
+    def best_proven_child(self, node: int) -> int:
+        """
+        Child to play in solver mode: a proven win if there is one, otherwise the most visited child not proven lost.
+        """
+        first = self.first_child[node]
+        end = first + self.num_children[node]
+        solved, value = self.solved[first:end], self.value[first:end]
+        won = solved & (value == WIN)
+        if won.any():
+            return first + int(won.argmax())
+        visits = np.where(solved & (value == LOSE), -1, self.N[first:end])
+        return first + int(visits.argmax())
+
+    def find_child(self, node: int, cell: int) -> int:
+        """
+        Child of the node reached by playing cell, or -1 if it is not in the tree.
+        """
+        first = self.first_child[node]
+        matches = np.flatnonzero(self.move[first:first + self.num_children[node]] == cell)
+        return first + int(matches[0]) if matches.size else -1
+
+    def most_visited_child(self, node: int) -> int:
+        first = self.first_child[node]
+        return first + int(np.argmax(self.N[first:first + self.num_children[node]]))
+
+    def principal_depth(self, node: int) -> int:
+        """
+        Length of the path of most visited children from the node down to a leaf.
+        """
+        depth = 0
+        while self.num_children[node]:
+            node = self.most_visited_child(node)
+            depth += 1
+        return depth
+
+    def backpropagate_batch(self, node: int, num_simulations: int, wins) -> None:
+        """
+        Add the results of several simulations from the node to the node and all of its ancestors.
+        :param wins: number of simulations won by each player, indexed by PLAYER_CODES
+        """
+        N, Q, mean, inv_sqrt_N, parent, player = self.N, self.Q, self.mean, self.inv_sqrt_N, self.parent, self.player
+        while node >= 0:
+            visits = int(N[node]) + num_simulations
+            N[node] = visits
+            Q[node] += num_simulations - wins[player[node]]
+            mean[node] = Q[node] / visits
+            inv_sqrt_N[node] = 1 / math.sqrt(visits)
+            node = parent[node]
+
+    def backpropagate_path(self, path, num_simulations: int, wins) -> None:
+        """
+        Add the results of simulations to the nodes of their path from the root, then prove the ancestors of the last
+        node if their values became known.
+        :param wins: number of simulations won by each player, indexed by PLAYER_CODES
+        """
+        N, Q, mean, inv_sqrt_N, player = self.N, self.Q, self.mean, self.inv_sqrt_N, self.player
+        for node in path:
+            visits = int(N[node]) + num_simulations
+            N[node] = visits
+            Q[node] += num_simulations - wins[player[node]]
+            mean[node] = Q[node] / visits
+            inv_sqrt_N[node] = 1 / math.sqrt(visits)
+        if self.solved[path[-1]]:
+            for node in reversed(path[:-1]):
+                if not self.solve(node):
+                    break
+
+    def backpropagate(self, node: int, winner: int) -> None:
+        """
+        Add the result of a simulation to the node and all of its ancestors.
+        :param winner: PLAYER_CODES of the winner, or NO_WINNER for a draw
+        """
+        N, Q, mean, inv_sqrt_N, parent, player = self.N, self.Q, self.mean, self.inv_sqrt_N, self.parent, self.player
+        while node >= 0:
+            visits = int(N[node]) + 1
+            N[node] = visits
+            if player[node] != winner:
+                Q[node] += 1
+            mean[node] = Q[node] / visits
+            inv_sqrt_N[node] = 1 / math.sqrt(visits)
+            node = parent[node]
+
+def search_worker(game: Game, letter: str, num_simulations: int, rollouts_per_leaf: int, solver: bool, deadline, seed: int):
+    """
+    Run an independent search from the game in a worker process.
+    :return: (moves, visits, proven values) of the root children, with None for unproven children, number of nodes
+             of the tree, length of its principal variation)
+    """
+    random.seed(seed)
+    player = TTT_MCTSPlayer(letter, num_simulations, rollouts_per_leaf=rollouts_per_leaf, solver=solver)
+    tree = player.tree
+    root = player.search(game, tree.reset(letter), deadline)
+    first = tree.first_child[root]
+    end = first + tree.num_children[root]
+    values = [int(value) if solved else None for solved, value in zip(tree.solved[first:end], tree.value[first:end])]
+    return tree.move[first:end].copy(), tree.N[first:end].copy(), values, tree.num_nodes, tree.principal_depth(root)
 
-class TreeNode():
-    def __init__(self, game_state: TicTacToe, player_letter: str, parent=None, parent_action=None):
-        self.player = player_letter
-        self.game_state = game_state
-        self.parent = parent
-        self.parent_action = parent_action
-        self.children = []
-        self.N = 0
-        self.Q = 0 
-    
-    def select(self) -> 'TreeNode':
-        """
-        Select the best child node based on UCB1 formula. Keep selecting until a leaf node is reached.
-        """
-        if self.is_leaf_node():
-            return self
-        return self.best_child().select()
-    
-    def expand(self) -> 'TreeNode':
-        """
-        Expand the current node by adding all possible child nodes.
-        """
-        cur_player = self.game_state.curr_player         
-        next_player = 'X' if cur_player == 'O' else 'O'   
-        for cell in self.game_state.empty_cells():
-            new_game_state = self.game_state.copy()
-            new_game_state.set_move(cell[0], cell[1], cur_player)
-            new_game_state.curr_player = next_player
-            self.children.append(TreeNode(new_game_state, next_player, parent=self, parent_action=cell))
-        rand_idx = random.randint(0, len(self.children) - 1)
-        return self.children[rand_idx]
-    
-    def simulate(self) -> int:
-        """
-        Run simulation from the current node until the game is over. Return the result of the simulation.
-        """ 
-        game_state = self.game_state.copy()
-        cur_player = game_state.curr_player
-   
-        while True:
-            if game_state.game_over():
-                if game_state.wins('X'):
-                    return 'X'
-                if game_state.wins('O'):
-                    return 'O'
-                return None
-            random_move = random.choice(game_state.empty_cells())
-            game_state.set_move(random_move[0], random_move[1], cur_player)
-            if cur_player == 'X':
-                cur_player = 'O'
-            else:
-                cur_player = 'X'
-    def backpropagate(self, winner):
-        """
-        Backpropagate the result of the simulation to the root node.
-        """
-        self.N+= 1
-        self.Q+= 1 if self.player != winner else 0
-        if self.parent != None:
-            self.parent.backpropagate(winner)
-
-    def is_leaf_node(self) -> bool:
-        return len(self.children) == 0
-    
-    def is_terminal_node(self) -> bool:
-        return self.game_state.game_over()
-    
-    def best_child(self) -> 'TreeNode':
-        return max(self.children, key=lambda c: c.ucb())
-    
-    def ucb(self, c=math.sqrt(2)) -> float:
-        if self.N == 0:
-            return float('inf')
-        return self.Q / self.N + c * np.sqrt(np.log(self.parent.N) / self.N)
-    
 class TTT_MCTSPlayer(Player):
-    def __init__(self, letter, num_simulations=NUM_SIMULATIONS):
+    def __init__(self, letter, num_simulations=NUM_SIMULATIONS, num_workers=1, rollouts_per_leaf=1, solver=False):
+        """
+        :param num_simulations: simulations per move (per worker in parallel mode)
+        :param num_workers: number of processes searching independent trees from the root
+        :param rollouts_per_leaf: random playouts per expanded leaf, played as one batch when more than 1
+        :param solver: MCTS-Solver: prove wins, losses and draws, skip proven-lost moves, stop once the root is proven,
+                       and share the nodes of transposed positions (for games with a state_id)
+        """
         super().__init__(letter)
         self.num_simulations = num_simulations
-    
-    def get_move(self, game):
-        mcts = TreeNode(game, self.letter)
+        self.num_workers = num_workers
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.solver = solver
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.tree = MCTSTree()
+        #* Tree kept between moves: root node, its board, its player and the move played from it
+        self.root = None
+        self.root_state = None
+        self.root_letter = None
+        self.last_cell = None
+        self.reused_visits = 0
+
+    def reset(self):
+        self.root = None
+        self.root_state = None
+        self.root_letter = None
+        self.last_cell = None
+
+    def clear(self, seed):
+        self.reset()
+        self.rng = np.random.default_rng(seed)
+
+    def get_move(self, game, deadline=None):
+        start_time = time.perf_counter() if self.stats_enabled else None
+        if self.num_workers > 1:
+            return self._parallel_move(game, deadline, start_time)
         
-        for _ in range(self.num_simulations):
-            leaf = mcts.select()
-            chose_node = leaf
-            if not leaf.is_terminal_node():
-                chose_node = leaf.expand()
-            winner = chose_node.simulate() 
-            chose_node.backpropagate(winner) 
+        tree = self.tree
+        size = game.size
+        root = self._reuse_root(game)
+        if root is None:
+            root = tree.reset(self.letter)
+        self.reused_visits = int(tree.N[root])
+        self.search(game, root, deadline)
+
+        if self.solver:
+            cell = int(tree.move[tree.best_proven_child(root)])
+        else:
+            cell = int(tree.move[tree.most_visited_child(root)])
+        self.root = root
+        self.root_state = [row[:] for row in game.board_state]
+        self.root_letter = self.letter
+        self.last_cell = cell
+        if self.stats_enabled:
+            # Simulations count every playout; reused visits come from the tree kept since the last move
+            self.record_stats(simulations=int(tree.N[root]) - self.reused_visits, tree_nodes=tree.num_nodes, reused=self.reused_visits,
+                              depth=tree.principal_depth(root), time=time.perf_counter() - start_time)
+        return [cell // size, cell % size]
+
+    def search(self, game: Game, root: int, deadline=None) -> int:
+        """
+        Run the simulations of a move from the root node of the tree.
+        :return: index of the root
+        """
+        if self.solver:
+            return self._solver_search(game, root, deadline)
+        if game.size == 3 and game.k == 3 and self.rollouts_per_leaf == 1:
+            return self._bitboard_search(game, root, deadline)
+        tree = self.tree
+        size = game.size
+        # All simulations play on one copy of the game with push/pop
+        search_game = game.copy()
+        search_game.curr_player = self.letter
+        root_moves = len(search_game.history)
+
+        for i in range(self.num_simulations):
+            # Stop at the deadline, but always run one simulation so the root has children
+            if deadline is not None and i > 0 and time.perf_counter() >= deadline:
+                break
+
+            # Selection: descend by UCB1 until a leaf, playing the moves on the game
+            node = root
+            while tree.num_children[node]:
+                node = tree.best_child(node)
+                cell = int(tree.move[node])
+                search_game.push(cell // size, cell % size)
+
+            # Expansion: add all children of a non-terminal leaf and pick one at random
+            if not search_game.game_over():
+                first = tree.expand(node, search_game.empty_cells(), size)
+                node = first + random.randint(0, tree.num_children[node] - 1)
+                cell = int(tree.move[node])
+                search_game.push(cell // size, cell % size)
+
+            if self.rollouts_per_leaf > 1:
+                tree.backpropagate_batch(node, self.rollouts_per_leaf, self.simulate_batch(search_game))
+            else:
+                tree.backpropagate(node, self.simulate(search_game))
+            while len(search_game.history) > root_moves:
+                search_game.pop()
+        return root
+
+    def _bitboard_search(self, game: Game, root: int, deadline=None) -> int:
+        """
+        search() on 3x3 boards with one rollout per leaf. Positions are two 9-bit integers, one per player, so
+        selection, expansion and rollouts play moves with bit operations and detect wins with the FIRST_WIN_LINE
+        lookup table, instead of calling the game.
+        """
+        tree = self.tree
+        board = game.board_state
+        start_bits = [0, 0]
+        for x in range(3):
+            for y in range(3):
+                if board[x][y] is not None:
+                    start_bits[PLAYER_CODES[board[x][y]]] |= 1 << (3 * x + y)
+        start_player = PLAYER_CODES[self.letter]
+        num_children, move, best_child, choice = tree.num_children, tree.move, tree.best_child, random.choice
+
+        for i in range(self.num_simulations):
+            if deadline is not None and i > 0 and time.perf_counter() >= deadline:
+                break
+
+            # Selection
+            bits = start_bits[:]
+            player = start_player
+            node = root
+            winner = NO_WINNER
+            over = False
+            while num_children[node]:
+                node = best_child(node)
+                bits[player] |= 1 << int(move[node])
+                player ^= 1
+            if FIRST_WIN_LINE[bits[1 - player]] >= 0:
+                winner, over = 1 - player, True
+            elif bits[0] | bits[1] == FULL_MASK:
+                over = True
+
+            if not over:
+                # Expansion, then a random playout where only the player who just moved can have won
+                first = tree.expand_moves(node, EMPTY_MOVES[bits[0] | bits[1]])
+                # The arrays are replaced when the tree grows
+                num_children, move = tree.num_children, tree.move
+                node = first + random.randint(0, num_children[node] - 1)
+                cell = int(move[node])
+                while True:
+                    bits[player] |= 1 << cell
+                    if FIRST_WIN_LINE[bits[player]] >= 0:
+                        winner = player
+                        break
+                    player ^= 1
+                    occupied = bits[0] | bits[1]
+                    if occupied == FULL_MASK:
+                        break
+                    cell = choice(EMPTY_MOVES[occupied])
+            tree.backpropagate(node, winner)
+        return root
+
+    def _solver_search(self, game: Game, root: int, deadline=None) -> int:
+        """
+        search() in solver mode. Proven nodes are not simulated again: their value is backpropagated instead.
+        """
+        tree = self.tree
+        size = game.size
+        search_game = game.copy()
+        search_game.curr_player = self.letter
+        root_moves = len(search_game.history)
+        use_transpositions = hasattr(search_game, 'state_id')
+
+        for i in range(self.num_simulations):
+            if tree.solved[root]:
+                break
+            if deadline is not None and i > 0 and time.perf_counter() >= deadline:
+                break
+
+            # Selection, recording the path since nodes may have several parents
+            node = root
+            path = [root]
+            while True:
+                if use_transpositions and not tree.num_children[node]:
+                    other = tree.transpositions.get(search_game.state_id)
+                    if other is not None:
+                        tree.share(node, other)
+                if not tree.num_children[node] or tree.solve(node):
+                    break
+                node = tree.best_unsolved_child(node)
+                cell = int(tree.move[node])
+                search_game.push(cell // size, cell % size)
+                path.append(node)
+
+            if not tree.solved[node] and search_game.game_over():
+                # Terminal leaf: the player who moved into it won or the game is a draw
+                tree.solved[node] = True
+                tree.value[node] = WIN if search_game.winner is not None else DRAW
+
+            if tree.solved[node]:
+                num_simulations = 1
+                wins = [0, 0]
+                if tree.value[node] != DRAW:
+                    winner = tree.player[node] if tree.value[node] == LOSE else 1 - tree.player[node]
+                    wins[winner] = 1
+            else:
+                # Expansion and simulation
+                if use_transpositions:
+                    tree.transpositions[search_game.state_id] = node
+                first = tree.expand(node, search_game.empty_cells(), size)
+                node = first + random.randint(0, tree.num_children[node] - 1)
+                cell = int(tree.move[node])
+                search_game.push(cell // size, cell % size)
+                path.append(node)
+                if search_game.game_over():
+                    tree.solved[node] = True
+                    tree.value[node] = WIN if search_game.winner is not None else DRAW
+                if self.rollouts_per_leaf > 1:
+                    num_simulations = self.rollouts_per_leaf
+                    wins = self.simulate_batch(search_game)
+                else:
+                    num_simulations = 1
+                    wins = [0, 0]
+                    winner = self.simulate(search_game)
+                    if winner != NO_WINNER:
+                        wins[winner] = 1
+
+            tree.backpropagate_path(path, num_simulations, wins)
+            while len(search_game.history) > root_moves:
+                search_game.pop()
+        return root
+
+    def _parallel_move(self, game, deadline=None, start_time=None):
+        """
+        Root parallelization: each worker searches its own tree with its own seed, then the visit counts
+        of the root moves are summed over the workers and the most visited move is played.
+        The tree is not kept between moves in this mode.
+        """
+        size = game.size
+        seed = random.getrandbits(32)
+        pool = get_pool(self.num_workers)
+        futures = [pool.submit(search_worker, game, self.letter, self.num_simulations, self.rollouts_per_leaf, self.solver, deadline, seed + i) for i in range(self.num_workers)]
+        visits = np.zeros(size * size, dtype=np.int64)
+        proven = {}
+        tree_nodes = depth = 0
+        for future in futures:
+            moves, counts, values, worker_nodes, worker_depth = future.result()
+            tree_nodes += worker_nodes
+            depth = max(depth, worker_depth)
+            np.add.at(visits, moves, counts)
+            proven.update((int(cell), value) for cell, value in zip(moves, values) if value is not None)
+        simulations = int(visits.sum())
+        # A move proven by any worker is proven: play a win, never a loss
+        won = [cell for cell, value in proven.items() if value == WIN]
+        if won:
+            cell = won[0]
+        else:
+            lost = [cell for cell, value in proven.items() if value == LOSE]
+            if len(lost) < np.count_nonzero(visits):
+                visits[lost] = -1
+            cell = int(visits.argmax())
+        if self.stats_enabled:
+            # Nodes of all the workers' trees, and the deepest of their principal variations
+            self.record_stats(simulations=simulations, tree_nodes=tree_nodes, depth=depth, time=time.perf_counter() - start_time)
+        return [cell // size, cell % size]
+
+    def _reuse_root(self, game):
+        """
+        Find the node of the current board in the tree kept from the previous move: the child for our
+        last move, then its child for the opponent's reply. It becomes the new root.
+        :return: index of the new root, or None if the tree cannot be reused
+        """
+        if self.root is None or self.root_letter != self.letter:
+            return None
+        size = game.size
+        board, root_state = game.board_state, self.root_state
+        if len(board) != len(root_state):
+            return None
+        new_cells = []
+        for x in range(size):
+            for y in range(size):
+                if board[x][y] != root_state[x][y]:
+                    if root_state[x][y] is not None:
+                        return None
+                    new_cells.append(size * x + y)
+        if len(new_cells) != 2 or self.last_cell not in new_cells:
+            return None
+        reply = new_cells[0] if new_cells[1] == self.last_cell else new_cells[1]
         
-        best_child = max(mcts.children, key=lambda c: c.N)
-        return best_child.parent_action
-    
+        tree = self.tree
+        node = tree.find_child(self.root, self.last_cell)
+        if node < 0 or not tree.num_children[node]:
+            return None
+        node = tree.find_child(node, reply)
+        if node < 0:
+            return None
+        return tree.compact(node)
+
+    def simulate(self, game: Game) -> int:
+        """
+        Play random moves until the game is over, then undo them.
+        :return: PLAYER_CODES of the winner, or NO_WINNER for a draw
+        """
+        num_moves = 0
+        while not game.game_over():
+            x, y = random.choice(game.empty_cells())
+            game.push(x, y)
+            num_moves += 1
+        winner = PLAYER_CODES.get(game.winner, NO_WINNER)
+        for _ in range(num_moves):
+            game.pop()
+        return winner
+
+    def simulate_batch(self, game: Game):
+        """
+        Play rollouts_per_leaf random games from the current position in one batch.
+        :return: number of games won by each player, indexed by PLAYER_CODES
+        """
+        count = self.rollouts_per_leaf
+        boards = np.repeat(encode(game)[None], count, axis=0)
+        to_move = np.full(count, PLAYER_DIGITS[game.curr_player], dtype=np.int8)
+        winners = get_engine(game.size, game.k).rollout(boards, to_move, self.rng)
+        wins = np.bincount(winners, minlength=3)
+        return int(wins[PLAYER_DIGITS['X']]), int(wins[PLAYER_DIGITS['O']])
+
     def __str__(self) -> str:
-        return "MCTS Player"
\ No newline at end of file
+        return "MCTS Player"
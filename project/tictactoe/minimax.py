@@ -1,53 +1,106 @@
 from typing import List, Tuple, Union
 import random
 import math
-from ..player import Player
-from ..game import TicTacToe
+import time
+from ..player import Player, SearchTimeout
+from ..game import TicTacToe, CELLS
 from copy import deepcopy
 
+# Number of nodes searched between two deadline checks
+NODE_CHECK_INTERVAL = 256
+
 class TTT_MinimaxPlayer(Player):
     def __init__(self, letter):
         super().__init__(letter)
+        self.nodes = 0
+        self.depth_reached = 0
+        self._deadline = None
+        self._depth_limited = False
 
-    def get_move(self, game: TicTacToe) -> Union[List[int], Tuple[int, int]]:
-        depth = len(game.empty_cells())
+    def get_move(self, game: TicTacToe, deadline=None) -> Union[List[int], Tuple[int, int]]:
+        start_time = time.perf_counter() if self.stats_enabled else None
+        depth = game.num_empty_cells()
+        self.nodes = 0
+        self.depth_reached = 0
         if depth == 9:
             move = random.choice(list(game.empty_cells())) # Random move if it's the first move
         else:
-            choice = self.minimax(game, depth, self.letter)
-            move = [choice[0], choice[1]]
+            # Search on a single copy of the game with push/pop, so no node allocates a new board
+            search_game = game.copy()
+            search_game.curr_player = self.letter
+            self._deadline = deadline
+            
+            # Without a deadline, search the full depth at once. Otherwise deepen iteratively and keep
+            # the move of the deepest completed search when time runs out.
+            move = list(search_game.empty_cells()[0])
+            for max_depth in (range(depth, depth + 1) if deadline is None else range(1, depth + 1)):
+                self._depth_limited = False
+                try:
+                    move = self._search_root(search_game, max_depth)
+                except SearchTimeout:
+                    break
+                self.depth_reached = max_depth
+                if not self._depth_limited:
+                    break # Every line reached the end of the game, deeper searches give the same move
+        if self.stats_enabled:
+            if depth == 9:
+                self.skip_stats()
+            else:
+                self.record_stats(nodes=self.nodes, depth=self.depth_reached, time=time.perf_counter() - start_time)
         return move
 
-    def minimax(self, game: TicTacToe, depth: int, player_letter: str) -> Union[List[int], Tuple[int, int]]:
+    def _search_root(self, game: TicTacToe, depth: int) -> List[int]:
+        """
+        Search every move of the current game state to the given depth.
+        :return: [row, col] of the best move
+        """
+        next_letter = 'O' if self.letter == 'X' else 'X'
+        best = [None, None, -math.inf if self.letter == 'X' else math.inf]
+        for x, y in CELLS:
+            if not game.valid_move(x, y):
+                continue
+            game.push(x, y)
+            score = self.minimax(game, depth - 1, next_letter)
+            game.pop()
+            if (self.letter == 'X' and score > best[2]) or (self.letter == 'O' and score < best[2]):
+                best = [x, y, score]
+        return [best[0], best[1]]
+
+    def minimax(self, game: TicTacToe, depth: int, player_letter: str) -> int:
         """
-        Minimax algorithm that chooses the best move
+        Minimax algorithm that scores the current game state. The game is searched in place with push/pop and restored on return.
         :param game: current game state
         :param depth: node index in the tree (0 <= depth <= 9), but never 9 in this case
-        :param player_letter: value representing the player
-        :return: [row, col, best_score] of the selected move
+        :param player_letter: value representing the player to move
+        :return: the best score for the player to move
         """
-        best = [None, None, -math.inf]
-        if player_letter == 'O':
-            best = [None, None, math.inf]
-        if depth == 0 or game.game_over():
-            return [best[0], best[1], self.evaluate(game)]
-        for empty_cell in game.empty_cells(state=game.board_state):
-            x, y = empty_cell[0], empty_cell[1]
-            newgame = game.copy()
-            newgame.curr_player = player_letter
-            newgame.set_move(x, y, player_letter)
-            new_player_letter = 'X'
-            if player_letter == 'X':
-                new_player_letter = 'O'
-            score = self.minimax(newgame, depth - 1, new_player_letter)
-            score[0], score[1] = x, y
-            if player_letter == 'X':
-                if score[2] > best[2]:
-                    best = score
-            else:
-                if score[2] < best[2]:
-                    best = score 
-    
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes % NODE_CHECK_INTERVAL and time.perf_counter() >= self._deadline:
+            raise SearchTimeout
+        if game.game_over():
+            return self.evaluate(game)
+        if depth == 0:
+            self._depth_limited = True
+            return self.evaluate(game)
+        next_letter = 'O' if player_letter == 'X' else 'X'
+        if player_letter == 'X':
+            best = -math.inf
+            for x, y in CELLS:
+                if game.valid_move(x, y):
+                    game.push(x, y)
+                    score = self.minimax(game, depth - 1, next_letter)
+                    game.pop()
+                    if score > best:
+                        best = score
+        else:
+            best = math.inf
+            for x, y in CELLS:
+                if game.valid_move(x, y):
+                    game.push(x, y)
+                    score = self.minimax(game, depth - 1, next_letter)
+                    game.pop()
+                    if score < best:
+                        best = score
         return best
     
     def evaluate(self, game: TicTacToe) -> int:
@@ -56,16 +109,12 @@ class TTT_MinimaxPlayer(Player):
         :param game: the game state to evaluate
         :return: the score of the board from the perspective of current player
         """
-        score = 0
-        
-        if game.wins('X'):
-            score = 1
-        elif game.wins('O'):
-            score = -1
-        else:
-            score = 0
-            
-        return score
+        winner = game.winner
+        if winner == 'X':
+            return 1
+        elif winner == 'O':
+            return -1
+        return 0
     
     def __str__(self) -> str:
         return "Minimax Player"
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+This module contains the move ordering layer for alpha-beta search.
+
+Moves are cells numbered size*x + y, so the same ordering works for 3x3 Tic Tac Toe and larger boards.
+Moves are searched in this order:
+    1. the transposition-table move
+    2. killer moves: moves that caused a cutoff at the same ply in a sibling subtree
+    3. by static prior: number of winning lines through the cell (center > corners > edges on 3x3)
+    4. by history score, among moves with the same prior: sum of depth^2 over all cutoffs caused by the move
+The moves of each ply are written into a buffer allocated once, in static order, then reordered in place,
+so ordering a node allocates no list.
+"""
+from typing import List, Optional
+
+def static_prior(size: int = 3, k: int = 3) -> List[int]:
+    """
+    Count the k-in-a-row windows of a size x size board passing through each cell.
+    :return: list of counts indexed by size*x + y
+    """
+    prior = [0] * (size * size)
+    for x in range(size):
+        for y in range(size):
+            for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_x, end_y = x + (k - 1) * dx, y + (k - 1) * dy
+                if 0 <= end_x < size and 0 <= end_y < size:
+                    for i in range(k):
+                        prior[size * (x + i * dx) + (y + i * dy)] += 1
+    return prior
+
+class MoveOrdering():
+    def __init__(self, size: int = 3, k: int = 3, static: bool = True, killers: bool = True, history: bool = True, num_killers: int = 2):
+        """
+        :param size: board size
+        :param k: number of stones in a row to win
+        :param static: order by the static center/corner prior
+        :param killers: search killer moves first
+        :param history: order by the history heuristic
+        :param num_killers: number of killer moves kept per ply
+        """
+        self.size = size
+        self.use_static = static
+        self.use_killers = killers
+        self.use_history = history
+        self.num_killers = num_killers
+        self.prior = static_prior(size, k) if static else [0] * (size * size)
+        self.history = [0] * (size * size)
+        self.killers = [[] for _ in range(size * size + 1)]
+        #* Cells by decreasing prior, row-major on ties, with their coordinates
+        self.static_order = sorted(range(size * size), key=lambda cell: -self.prior[cell])
+        self.coords = [(cell // size, cell % size) for cell in range(size * size)]
+        #* Ordered moves of each ply, filled by order()
+        self.moves = [[0] * (size * size) for _ in range(size * size + 1)]
+
+    def order(self, game, ply: int, tt_cell: Optional[int] = None, dynamic: bool = True) -> int:
+        """
+        Write the legal moves of a node into self.moves[ply], best first. Ties keep the static order.
+        :param game: game at the node
+        :param ply: distance of the node from the root
+        :param tt_cell: best move stored in the transposition table, if any
+        :param dynamic: apply the killer moves and history scores, otherwise keep the static order
+        :return: number of legal moves, the first entries of self.moves[ply]
+        """
+        moves = self.moves[ply]
+        coords = self.coords
+        count = 0
+        for cell in self.static_order:
+            x, y = coords[cell]
+            if game.valid_move(x, y):
+                moves[count] = cell
+                count += 1
+        if not dynamic:
+            return count
+        
+        if self.use_history:
+            # Insertion sort by history within each run of equal priors, which are already in order
+            prior, history = self.prior, self.history
+            for i in range(1, count):
+                cell = moves[i]
+                cell_prior, cell_history = prior[cell], history[cell]
+                j = i
+                while j > 0 and prior[moves[j - 1]] == cell_prior and history[moves[j - 1]] < cell_history:
+                    moves[j] = moves[j - 1]
+                    j -= 1
+                moves[j] = cell
+        
+        if self.use_killers:
+            killers = self.killers[ply]
+            for i in range(len(killers) - 1, -1, -1):
+                self._to_front(moves, count, killers[i])
+        if tt_cell is not None:
+            self._to_front(moves, count, tt_cell)
+        return count
+
+    @staticmethod
+    def _to_front(moves: List[int], count: int, cell: int) -> None:
+        """
+        Move cell to the front of the first count moves, if it is one of them, keeping the order of the others.
+        """
+        for i in range(count):
+            if moves[i] == cell:
+                while i > 0:
+                    moves[i] = moves[i - 1]
+                    i -= 1
+                moves[0] = cell
+                return
+
+    def cutoff(self, cell: int, ply: int, depth: int) -> None:
+        """
+        Record a move that caused a beta cutoff.
+        :param cell: the move
+        :param ply: distance of the node from the root
+        :param depth: remaining depth of the node
+        """
+        if self.use_killers:
+            killers = self.killers[ply]
+            if cell in killers:
+                killers.remove(cell)
+            killers.insert(0, cell)
+            del killers[self.num_killers:]
+        if self.use_history:
+            self.history[cell] += depth * depth
+
+    def clear(self) -> None:
+        """
+        Forget the killer moves and history scores of all earlier searches.
+        """
+        for killers in self.killers:
+            killers.clear()
+        self.history = [0] * len(self.history)
+
+    def new_search(self) -> None:
+        """
+        Prepare for the search of a new move: killers are reset and history scores are halved.
+        """
+        for killers in self.killers:
+            killers.clear()
+        self.history = [score // 2 for score in self.history]
@@ -0,0 +1,133 @@
+"""
+This module contains the perfect-play oracle table and the Oracle Player for the TicTacToe game.
+
+The table holds one uint16 entry per base-3 board index (see TicTacToe.state_id):
+    bits 0-8  : optimal moves for the player to move (bit 3*x + y)
+    bits 9-10 : game-theoretic value + 1 (0: O wins, 1: draw, 2: X wins)
+    bit 15    : set if the position is reachable
+Build it once with `python -m project.tictactoe.build_oracle`. Players memory-map the file read-only,
+so every position is answered with one array read and several processes share the same pages.
+"""
+import os
+import random
+import time
+import numpy as np
+from ..player import Player
+from ..game import TicTacToe, CELLS
+
+ORACLE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'oracle.bin')
+MAGIC = b'TTTORC01'
+NUM_STATES = 3 ** 9
+MOVES_MASK = 0x1FF
+VALUE_SHIFT = 9
+REACHABLE = 1 << 15
+
+_tables = {}
+
+def build_oracle_table(path: str = ORACLE_PATH) -> np.ndarray:
+    """
+    Enumerate every reachable position from the empty board, solve it and write the table to path.
+    :param path: output file
+    :return: the table as an array of NUM_STATES uint16 entries
+    """
+    table = np.zeros(NUM_STATES, dtype='<u2')
+
+    def solve(game: TicTacToe) -> int:
+        """
+        Solve the current position and record it in the table.
+        :return: the value of the position (1: X wins, 0: draw, -1: O wins)
+        """
+        state_id = game.state_id
+        entry = int(table[state_id])
+        if entry & REACHABLE:
+            return ((entry >> VALUE_SHIFT) & 3) - 1
+
+        moves = 0
+        if game.winner == 'X':
+            value = 1
+        elif game.winner == 'O':
+            value = -1
+        elif game.num_empty_cells() == 0:
+            value = 0
+        else:
+            sign = 1 if game.curr_player == 'X' else -1
+            value = None
+            for x, y in CELLS:
+                if not game.valid_move(x, y):
+                    continue
+                game.push(x, y)
+                score = sign * solve(game)
+                game.pop()
+                if value is None or score > value:
+                    value, moves = score, 0
+                if score == value:
+                    moves |= 1 << (3 * x + y)
+            value *= sign
+        table[state_id] = REACHABLE | ((value + 1) << VALUE_SHIFT) | moves
+        return value
+
+    solve(TicTacToe())
+
+    # Write to a temporary file first, so other processes never map a partial table
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(table.tobytes())
+    os.replace(tmp_path, path)
+    return table
+
+def load_oracle_table(path: str = ORACLE_PATH) -> np.ndarray:
+    """
+    Memory-map the oracle table read-only, building it first if the file is missing or invalid.
+    The mapping is shared by all players of the process.
+    :param path: table file
+    :return: the table as a read-only array of NUM_STATES uint16 entries
+    """
+    if path in _tables:
+        return _tables[path]
+
+    expected_size = len(MAGIC) + 2 * NUM_STATES
+    valid = False
+    if os.path.exists(path) and os.path.getsize(path) == expected_size:
+        with open(path, 'rb') as f:
+            valid = f.read(len(MAGIC)) == MAGIC
+    if not valid:
+        build_oracle_table(path)
+
+    table = np.memmap(path, dtype='<u2', mode='r', offset=len(MAGIC), shape=(NUM_STATES,))
+    _tables[path] = table
+    return table
+
+class TTT_OraclePlayer(Player):
+    def __init__(self, letter, path=ORACLE_PATH):
+        super().__init__(letter)
+        self.table = load_oracle_table(path)
+
+    def get_move(self, game: TicTacToe, deadline=None):
+        """
+        Play a random optimal move of the current position. Positions that cannot be reached in a game have
+        no optimal moves in the table, and get a random legal move.
+        """
+        if game.game_over():
+            raise ValueError("The game is over, there is no move to play!")
+        start_time = time.perf_counter() if self.stats_enabled else None
+        moves = int(self.table[game.state_id]) & MOVES_MASK
+        if moves:
+            cell = random.choice([i for i in range(9) if moves >> i & 1])
+            move = [cell // 3, cell % 3]
+        else:
+            move = list(random.choice(game.empty_cells()))
+        if self.stats_enabled:
+            self.record_stats(table_hits=int(moves != 0), time=time.perf_counter() - start_time)
+        return move
+
+    def value(self, game: TicTacToe) -> int:
+        """
+        Game-theoretic value of the current position.
+        :return: 1 if X wins, -1 if O wins and 0 for a draw under perfect play
+        """
+        return ((int(self.table[game.state_id]) >> VALUE_SHIFT) & 3) - 1
+
+    def __str__(self) -> str:
+        return "Oracle Player"
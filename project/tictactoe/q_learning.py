@@ -1,43 +1,194 @@
-from typing import List, Tuple, Union             
+from typing import List, Optional, Tuple, Union             
 from ..player import Player
-from ..game import TicTacToe
+from ..game import TicTacToe, CELL_POWERS, PLAYER_DIGITS
 from . import *
+from .rollout import win_lines
+from .symmetry import SYMMETRIES, INVERSE_SYMMETRIES
 from tqdm import tqdm
 from copy import deepcopy
 
+import hashlib
+import json
 import math
+import multiprocessing
+import multiprocessing.connection
+import os
 import random
+import time
 import numpy as np
+from multiprocessing import shared_memory
 
 NUM_EPISODES = 200000
 LEARNING_RATE = 0.2
 DISCOUNT_FACTOR = 0.2
 EXPLORATION_RATE = 0.1
+BATCH_SIZE = 128
+SYNC_INTERVAL = 5000
+SEED = 2050
+# Seconds a parallel training worker waits for the others at a sync before giving up
+BARRIER_TIMEOUT = 600
+Q_TABLE_DIR = os.path.join(os.path.dirname(__file__), 'data')
 WIN = 1
 LOSE = -1
 DRAW = 0
+
+# Q-tables are indexed by the base-3 state id of the board (see TicTacToe.state_id) and the cell 3*x + y
+NUM_STATES = 3 ** 9
+# State id increment of a piece on each cell, per player digit
+CELL_POWERS_FLAT = 3 ** np.arange(8, -1, -1)
+# DIGITS[state_id, cell] is 0 for an empty cell, else the PLAYER_DIGITS of the piece
+DIGITS = np.arange(NUM_STATES)[:, None] // CELL_POWERS_FLAT % 3
+# LEGAL[state_id, cell] is True if the cell is empty
+LEGAL = DIGITS == 0
+# Added to Q-values before argmax: 0 on empty cells, -inf on occupied cells
+MOVE_MASK = np.where(LEGAL, 0, -np.inf).astype(np.float32)
+WIN_LINE_CELLS = win_lines(3, 3)
+
+# Symmetry-reduced tables have one row per canonical state: the smallest state id among the 8 symmetric boards.
+# SYMMETRY_CELLS[g, cell] is the cell `cell` is mapped to by symmetry g (see symmetry.py)
+SYMMETRY_CELLS = np.array(SYMMETRIES)
+INVERSE_SYMMETRY_CELLS = np.array(INVERSE_SYMMETRIES)
+_symmetric_states = np.stack([DIGITS @ CELL_POWERS_FLAT[permutation] for permutation in SYMMETRY_CELLS])
+# Symmetry mapping each state to its canonical state
+CANONICAL_SYMMETRY = _symmetric_states.argmin(axis=0)
+# Canonical state id of each row, and row of each state id
+CANONICAL_STATES, CANONICAL_ROW = np.unique(_symmetric_states.min(axis=0), return_inverse=True)
+del _symmetric_states
+
+def shared_tables(buffer, num_workers: int, num_rows: int):
+    """
+    Views of the shared memory of the parallel trainer: the Q-table, update counts since the last sync and seen mask
+    of each worker, for the player (index 0) and its self-play opponent (index 1).
+    :param num_rows: number of rows of the Q-tables
+    :return: (Q-tables, updates, seen) of shapes (num_workers, 2, num_rows, 9), same, (num_workers, 2, num_rows)
+    """
+    table_shape = (num_workers, 2, num_rows, 9)
+    table_size = int(np.prod(table_shape)) * 4
+    q = np.ndarray(table_shape, dtype=np.float32, buffer=buffer)
+    updates = np.ndarray(table_shape, dtype=np.float32, buffer=buffer, offset=table_size)
+    seen = np.ndarray(table_shape[:3], dtype=np.bool_, buffer=buffer, offset=2 * table_size)
+    return q, updates, seen
+
+def shared_size(num_workers: int, num_rows: int) -> int:
+    return num_workers * 2 * num_rows * (2 * 9 * 4 + 1)
+
+def merge_tables(base: np.ndarray, q: np.ndarray, updates: np.ndarray, seen: np.ndarray, learning_rate: float = LEARNING_RATE):
+    """
+    Merge the tables that the workers trained from the same base table since the last sync, as if all of their
+    updates had been made by one trainer. After k updates at the learning rate alpha, a worker's value has moved a
+    fraction 1 - (1 - alpha)^k of the way from the base value to its target. The targets of the workers are averaged,
+    weighted by their numbers of updates, and the merged value moves towards it by the fraction of all the updates.
+    Averaging the values themselves would keep only the progress of one worker, not the sum of their progress.
+    With one worker, the merged table is the worker's table.
+    :param base: table of all the workers at the last sync
+    :param updates: number of updates of each Q-value by each worker since the last sync
+    :return: (merged Q-table, merged seen mask)
+    """
+    base = base.astype(np.float64)
+    updated = updates > 0
+    # Fraction of the way to the target covered by each worker, and its target
+    fractions = 1 - (1 - learning_rate) ** updates
+    targets = np.where(updated, base + (q - base) / np.where(updated, fractions, 1), 0)
+    total = updates.sum(axis=0)
+    target = (targets * updates).sum(axis=0) / np.maximum(total, 1)
+    merged = np.where(total > 0, base + (1 - (1 - learning_rate) ** total) * (target - base), base)
+    return merged.astype(np.float32), seen.any(axis=0)
+
+def train_worker(players, worker_id: int, num_episodes: int, num_rounds: int, shm_name: str, barrier):
+    """
+    Train a copy of a player and its self-play opponent on num_episodes episodes, in num_rounds rounds.
+    After each round the tables of all workers are written to shared memory and merged.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        player, opponent = players
+        q, updates, seen = shared_tables(shm.buf, barrier.parties, len(player.Q))
+        seed = None if player.seed is None else player.seed + worker_id
+        rng = np.random.default_rng(seed)
+        for p in players:
+            p.updates = np.zeros_like(p.Q)
+        
+        for sync_round in range(num_rounds):
+            bases = [p.Q.copy() for p in players]
+            start = sync_round * num_episodes // num_rounds
+            end = (sync_round + 1) * num_episodes // num_rounds
+            for batch_start in range(start, end, player.batch_size):
+                player.play_batch(opponent, batch_start, min(player.batch_size, end - batch_start), rng)
+            for i, p in enumerate(players):
+                q[worker_id, i] = p.Q
+                updates[worker_id, i] = p.updates
+                seen[worker_id, i] = p.seen
+                p.updates[:] = 0
+            barrier.wait(BARRIER_TIMEOUT)
+            for i, p in enumerate(players):
+                p.Q[:], p.seen[:] = merge_tables(bases[i], q[:, i], updates[:, i], seen[:, i], p.learning_rate)
+            barrier.wait(BARRIER_TIMEOUT)
+        # Every worker holds the merged tables: the first one hands them to the parent
+        if worker_id == 0:
+            q[0, 0], seen[0, 0] = player.Q, player.seen
+        del q, updates, seen
+    except BaseException:
+        # Release the other workers waiting at the barrier. Workers killed without an exception are handled by
+        # the parent, and a worker that stops responding by the barrier timeout
+        barrier.abort()
+        raise
+    finally:
+        shm.close()
+
 class TTT_QPlayer(Player):
-    def __init__(self, letter, transfer_player=None):
+    def __init__(self, letter, transfer_player=None, batch_size=BATCH_SIZE, seed=SEED, num_workers=1, sync_interval=SYNC_INTERVAL, symmetric=False):
+        """
+        :param transfer_player: class of the training opponent, or None for self-play against another Q Player
+        :param batch_size: number of self-play games trained in lockstep, 1 for the sequential trainer
+        :param seed: seed of the random moves, so training is reproducible
+        :param num_workers: number of processes sharing the self-play episodes
+        :param sync_interval: episodes played by each worker between two merges of the workers' tables
+        :param symmetric: share one row of the Q-table between the 8 rotations and reflections of a board
+        """
         super().__init__(letter)
         self.opponent = transfer_player
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.sync_interval = sync_interval
+        self.seed = seed
+        self.random = random.Random(seed)
         self.num_episodes = NUM_EPISODES
         self.learning_rate = LEARNING_RATE
         self.gamma = DISCOUNT_FACTOR
         self.epsilon = EXPLORATION_RATE
-        self.Q = {}  
+        self.symmetric = symmetric
+        #* Letter the table is trained and saved for: self.letter changes when players swap letters between games
+        self.table_letter = self.letter
+        #* Rows are state ids, or canonical states when symmetric. Columns are cells in the frame of the row
+        num_rows = len(CANONICAL_STATES) if symmetric else NUM_STATES
+        self.Q = np.zeros((num_rows, 9), dtype=np.float32)
+        self.move_mask = MOVE_MASK[CANONICAL_STATES] if symmetric else MOVE_MASK
+        #* Rows with at least one update: greedy moves fall back to random moves elsewhere
+        self.seen = np.zeros(num_rows, dtype=np.bool_)
+        #* Batch updates of each Q-value since the last merge, only counted by the workers of the parallel trainer
+        self.updates = None
         self.action_history = []
     
     def train(self, game):
         """
         Train the Q-Learning player against an transfer player to update the Q tables.
         """
+        if not self.Q.flags.writeable:
+            # Loaded tables are read-only memory maps
+            self.Q = np.array(self.Q)
+            self.seen = np.array(self.seen)
         opponent_letter = 'X' if self.letter == 'O' else 'O'
         if self.opponent is None:
-            opponent = TTT_QPlayer(opponent_letter)
+            opponent = TTT_QPlayer(opponent_letter, batch_size=self.batch_size, seed=self.random.getrandbits(32), symmetric=self.symmetric)
+            if self.num_workers > 1:
+                return self.train_parallel(opponent)
+            if self.batch_size > 1:
+                return self.train_batched(opponent)
         else:
             opponent = self.opponent(opponent_letter)
             
         print(f"Training Q Player [{self.letter}] for {self.num_episodes} episodes...")
+        # All episodes are played on one game: the state ids before and after each move are all that is stored
         game_state = game.copy()
         
         for _ in tqdm(range(self.num_episodes)):               
@@ -56,16 +207,14 @@ class TTT_QPlayer(Player):
                 else:
                     action = current_player.get_move(game_state)
                 
-                next_game_state = game_state.copy()
-                next_game_state.set_move(action[0], action[1], current_player.letter)
-                
+                state = game_state.state_id
+                game_state.set_move(action[0], action[1], current_player.letter)
 
                 if isinstance(current_player, TTT_QPlayer):
-                    state = current_player.hash_board(game_state.board_state) 
-                    current_player.action_history.append((state, action, self.hash_board(next_game_state.board_state))) 
+                    current_player.action_history.append((state, 3 * action[0] + action[1], game_state.state_id)) 
                 
-                if next_game_state.game_over():
-                    reward = 1 if next_game_state.wins(current_player.letter) else -1 if next_game_state.wins(next_player.letter) else 0
+                if game_state.game_over():
+                    reward = 1 if game_state.winner == current_player.letter else -1 if game_state.winner == next_player.letter else 0
                     if isinstance(current_player, TTT_QPlayer):
                         current_player.update_rewards(reward)
                     if isinstance(next_player, TTT_QPlayer):
@@ -73,19 +222,167 @@ class TTT_QPlayer(Player):
                     break
                 else: 
                     current_player, next_player = next_player, current_player
-                    game_state = next_game_state    
             
             self.letter = 'X' if self.letter == 'O' else 'O'
             opponent.letter = 'X' if opponent.letter == 'O' else 'O'        
         
       
 
+    def train_batched(self, opponent: 'TTT_QPlayer'):
+        """
+        Self-play training with batch_size games stepped in lockstep on NumPy boards.
+        Episodes alternate letters like train(). The transitions of a batch are applied with update_batch(), so a
+        batch of one game gives the same updates as train().
+        """
+        print(f"Training Q Player [{self.letter}] for {self.num_episodes} episodes in batches of {self.batch_size}...")
+        rng = np.random.default_rng(self.random.getrandbits(64))
+        
+        for start in tqdm(range(0, self.num_episodes, self.batch_size)):
+            self.play_batch(opponent, start, min(self.batch_size, self.num_episodes - start), rng)
+
+    def train_parallel(self, opponent: 'TTT_QPlayer'):
+        """
+        Self-play training with the episodes split over num_workers processes. Each worker trains its own copy of
+        both tables in batches like train_batched(), with seed + worker id, and the tables are merged with merge_tables() every
+        sync_interval episodes per worker, so the result does not depend on the scheduling of the processes. The merge
+        adds up the progress of the workers, so the table is about as strong as one trained by train_batched().
+        """
+        num_workers = self.num_workers
+        print(f"Training Q Player [{self.letter}] for {self.num_episodes} episodes on {num_workers} workers...")
+        episodes = [(self.num_episodes + worker_id) // num_workers for worker_id in range(num_workers)]
+        num_rounds = max(1, math.ceil(max(episodes) / self.sync_interval))
+        
+        shm = shared_memory.SharedMemory(create=True, size=shared_size(num_workers, len(self.Q)))
+        try:
+            barrier = multiprocessing.Barrier(num_workers)
+            workers = [multiprocessing.Process(target=train_worker, args=((self, opponent), worker_id, episodes[worker_id], num_rounds, shm.name, barrier))
+                       for worker_id in range(num_workers)]
+            for worker in workers:
+                worker.start()
+            # Wait for the workers as they exit. If one fails, even when killed by a signal, stop the others
+            running = list(workers)
+            while running:
+                multiprocessing.connection.wait([worker.sentinel for worker in running])
+                running = [worker for worker in running if worker.exitcode is None]
+                if any(worker.exitcode not in (None, 0) for worker in workers):
+                    barrier.abort()
+                    for worker in running:
+                        worker.terminate()
+                    for worker in workers:
+                        worker.join()
+                    raise RuntimeError("A Q-Learning training worker failed.")
+            q, _, seen = shared_tables(shm.buf, num_workers, len(self.Q))
+            self.Q, self.seen = q[0, 0].copy(), seen[0, 0].copy()
+            del q, seen
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def play_batch(self, opponent: 'TTT_QPlayer', start: int, n: int, rng: np.random.Generator):
+        """
+        Play and learn from n self-play episodes in lockstep, numbered from start.
+        """
+        games = np.arange(n)
+        # This player is X in every other episode, starting with its own letter
+        self_is_x = ((start + games) % 2 == 0) == (self.letter == 'X')
+        boards = np.zeros((n, 9), dtype=np.int8)
+        states = np.zeros(n, dtype=np.int64)
+        #* Transitions (state id, cell, next state id) of each game by ply, and the number of plies played
+        history = np.zeros((3, n, 9), dtype=np.int64)
+        length = np.full(n, 9)
+        winner = np.zeros(n, dtype=np.int8)
+        active = games
+        
+        for ply in range(9):
+            digit = PLAYER_DIGITS['X'] if ply % 2 == 0 else PLAYER_DIGITS['O']
+            self_moves = self_is_x[active] == (ply % 2 == 0)
+            cells = np.empty(len(active), dtype=np.int64)
+            for player, mask in ((self, self_moves), (opponent, ~self_moves)):
+                if mask.any():
+                    cells[mask] = player.choose_actions(states[active[mask]], rng)
+            
+            history[0, active, ply] = states[active]
+            history[1, active, ply] = cells
+            boards[active, cells] = digit
+            states[active] += digit * CELL_POWERS_FLAT[cells]
+            history[2, active, ply] = states[active]
+            
+            won = (boards[active][:, WIN_LINE_CELLS] == digit).all(axis=2).any(axis=1)
+            winner[active[won]] = digit
+            length[active[won]] = ply + 1
+            active = active[~won]
+            if not active.size:
+                break
+        
+        # Rewards are +1 for a win, -1 for a loss and 0 for a draw, from X's point of view
+        x_reward = (winner == PLAYER_DIGITS['X']).astype(np.float64) - (winner == PLAYER_DIGITS['O'])
+        plies = np.arange(9)
+        played = plies[None, :] < length[:, None]
+        x_moves = plies[None, :] % 2 == 0
+        for player, is_x in ((self, self_is_x), (opponent, ~self_is_x)):
+            mask = played & (x_moves == is_x[:, None])
+            reward = np.where(is_x, x_reward, -x_reward)
+            player.update_batch(history[0][mask], history[1][mask], history[2][mask], np.broadcast_to(reward[:, None], mask.shape)[mask])
+
+    def table_index(self, states, cells=None):
+        """
+        Rows of the Q-table of state ids, and cells mapped to the frame of the rows. Works on scalars and arrays.
+        :return: (rows, cells), with cells None if not given
+        """
+        if not self.symmetric:
+            return states, cells
+        rows = CANONICAL_ROW[states]
+        if cells is not None:
+            cells = SYMMETRY_CELLS[CANONICAL_SYMMETRY[states], cells]
+        return rows, cells
+
+    def best_actions(self, states: np.ndarray) -> np.ndarray:
+        """
+        Legal cells with the highest Q-value in each state, first in the frame of the table row on ties.
+        """
+        rows, _ = self.table_index(states)
+        cells = (self.Q[rows] + self.move_mask[rows]).argmax(axis=1)
+        if self.symmetric:
+            cells = INVERSE_SYMMETRY_CELLS[CANONICAL_SYMMETRY[states], cells]
+        return cells
+
+    def choose_actions(self, states: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        choose_action() for a batch of state ids: ε-greedy, with random moves in states never updated.
+        :return: the cells 3*x + y of the chosen actions
+        """
+        rows, _ = self.table_index(states)
+        mask = MOVE_MASK[states]
+        explore = (rng.random(len(states)) < self.epsilon) | ~self.seen[rows]
+        greedy = self.best_actions(states)
+        # Argmax of random scores over the empty cells: a uniformly random legal move
+        random_moves = (rng.random(mask.shape) + mask).argmax(axis=1)
+        return np.where(explore, random_moves, greedy)
+
+    def update_batch(self, states: np.ndarray, actions: np.ndarray, next_states: np.ndarray, rewards: np.ndarray):
+        """
+        update_q_values() for a batch of transitions, all computed from the Q-values before the batch.
+        The updates of a state-action pair appearing several times in the batch are averaged.
+        """
+        rows, actions = self.table_index(states, actions)
+        next_rows, _ = self.table_index(next_states)
+        Q = self.Q.reshape(-1)
+        pairs = rows * 9 + actions
+        targets = rewards + self.gamma * self.Q[next_rows].max(axis=1)
+        deltas = self.learning_rate * (targets - Q[pairs])
+        unique_pairs, inverse, counts = np.unique(pairs, return_inverse=True, return_counts=True)
+        Q[unique_pairs] += (np.bincount(inverse, weights=deltas) / counts).astype(np.float32)
+        self.seen[rows] = True
+        if self.updates is not None:
+            # Each pair moves once per batch, by the average of its updates
+            self.updates.reshape(-1)[unique_pairs] += 1
+
     def update_rewards(self, reward: float):
         """
         :param reward: reward value at the end of the game
         Given the reward at the end of the game, update the Q-values for each state-action pair in the game with the Bellman equation:
             Q(s, a) = Q(s, a) + alpha * (reward + gamma * max(Q(s', a')) - Q(s, a)) 
-                    with each (s, a) stored self.action_history.
+                    with each (s, a) stored self.action_history as (state id, cell, next state id).
         We need to update the Q-values for each state-action pair in the action history because the reward is only received at the end.
 
         """
@@ -94,53 +391,153 @@ class TTT_QPlayer(Player):
             state, action, next_state = trip[0], trip[1], trip[2]
             self.update_q_values(state, action, next_state, reward)
 
-    def choose_action(self, game: TicTacToe) -> Union[List[int], Tuple[int, int]]:
+    def choose_action(self, game: TicTacToe, epsilon: Optional[float] = None) -> Union[List[int], Tuple[int, int]]:
         """
         Choose action with ε-greedy strategy.
         if random number < ε, choose random action
         else choose action with the highest Q-value
+        :param epsilon: exploration rate, the training rate self.epsilon if None
         """ 
-        state = self.hash_board(game.board_state)
-        empty_cells = game.empty_cells()
+        state = game.state_id
+        row, _ = self.table_index(state)
+        if epsilon is None:
+            epsilon = self.epsilon
         
-        if random.uniform(0, 1) < self.epsilon or state not in self.Q:
-            return random.choice(empty_cells)
-
-        q_values = self.Q[state]
-        empty_q_values = [q_values[cell[0], cell[1]] for cell in empty_cells] 
-        max_q_value = max(empty_q_values)                                       
-        max_q_indices = [i for i in range(len(empty_cells)) if empty_q_values[i] == max_q_value]                                
-        return(empty_cells[max_q_indices[0]]) 
+        if self.random.uniform(0, 1) < epsilon or not self.seen[row]:
+            return self.random.choice(game.empty_cells())
+
+        # Masked argmax: the first empty cell with the highest Q-value
+        cell = int((self.Q[row] + self.move_mask[row]).argmax())
+        if self.symmetric:
+            cell = int(INVERSE_SYMMETRY_CELLS[CANONICAL_SYMMETRY[state], cell])
+        return (cell // 3, cell % 3)
         
 
     def update_q_values(self, state, action, next_state, reward):
         """
         Given (s, a, s', r), update the Q-value for the state-action pair (s, a) using the Bellman equation:
             Q(s, a) = Q(s, a) + alpha * (reward + gamma * max(Q(s', a')) - Q(s, a))
+        :param state: state id of s
+        :param action: cell 3*x + y of a
+        :param next_state: state id of s'
         """
-        q_values = self.Q.get(state, np.zeros((3, 3)))
-        next_q_values = self.Q.get(next_state, np.zeros((3, 3)))
-        max_next_q_value = np.max(next_q_values)
+        row, action = self.table_index(state, action)
+        next_row, _ = self.table_index(next_state)
+        q_values = self.Q[row]
+        # max() of a short list is cheaper than a NumPy reduction on one row
+        max_next_q_value = max(self.Q[next_row].tolist())
+        q_values[action] += self.learning_rate * (reward + self.gamma * max_next_q_value - q_values[action])
+        self.seen[row] = True
 
-        q_values[action[0], action[1]] += self.learning_rate * (reward + self.gamma * max_next_q_value - q_values[action[0], action[1]])
+    def hash_board(self, board):
+        """
+        State id of a board, see table_index() for its row in the Q-table.
+        """
+        return sum(PLAYER_DIGITS[board[x][y]] * CELL_POWERS[x][y] for x in range(3) for y in range(3) if board[x][y] is not None)
 
-        self.Q[state] = q_values
+    def config(self) -> dict:
+        """
+        Everything the trained table depends on. Saved tables are only reused for the same config.
+        """
+        return {
+            'letter': self.table_letter,
+            'opponent': None if self.opponent is None else self.opponent.__name__,
+            'num_episodes': self.num_episodes,
+            'learning_rate': self.learning_rate,
+            'discount_factor': self.gamma,
+            'exploration_rate': self.epsilon,
+            'batch_size': self.batch_size,
+            'num_workers': self.num_workers,
+            'sync_interval': self.sync_interval,
+            'symmetric': self.symmetric,
+            'seed': self.seed,
+        }
 
-    def hash_board(self, board):
-        key = ''
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == 'X':
-                    key += '1'
-                elif board[i][j] == 'O':
-                    key += '2'
-                else:
-                    key += '0'
-        return key
+    def table_path(self, directory: str = Q_TABLE_DIR) -> str:
+        """
+        Path of the saved table for the current config, without extension.
+        """
+        config_hash = hashlib.sha256(json.dumps(self.config(), sort_keys=True).encode()).hexdigest()[:16]
+        return os.path.join(directory, f'qtable-{config_hash}')
+
+    def save(self, directory: str = Q_TABLE_DIR):
+        """
+        Save the Q-table and the seen mask as .npy files, with the config, their checksum, size and modification
+        time in a .json file. Files are written under temporary names first, so other processes never load a partial table.
+        """
+        path = self.table_path(directory)
+        os.makedirs(directory, exist_ok=True)
+        metadata = {'config': self.config(), 'sha256': {}, 'stat': {}}
+        for suffix, array in (('.npy', self.Q), ('.seen.npy', self.seen)):
+            tmp_path = f"{path}{suffix}.{os.getpid()}.tmp"
+            digest = hashlib.sha256()
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            metadata['sha256'][suffix] = digest.hexdigest()
+            os.replace(tmp_path, path + suffix)
+            stat = os.stat(path + suffix)
+            metadata['stat'][suffix] = [stat.st_size, stat.st_mtime_ns]
+        tmp_path = f"{path}.json.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, path + '.json')
+
+    def load(self, directory: str = Q_TABLE_DIR) -> bool:
+        """
+        Memory-map the saved table of the current config read-only, if there is one with a valid checksum.
+        Files with the size and modification time recorded at save time are mapped without reading them.
+        Others, e.g. copied tables, are hashed first.
+        :return: True if the table was loaded
+        """
+        path = self.table_path(directory)
+        try:
+            with open(path + '.json') as f:
+                metadata = json.load(f)
+            if metadata['config'] != self.config():
+                return False
+            for suffix, checksum in metadata['sha256'].items():
+                stat = os.stat(path + suffix)
+                if [stat.st_size, stat.st_mtime_ns] == metadata.get('stat', {}).get(suffix):
+                    continue
+                digest = hashlib.sha256()
+                with open(path + suffix, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(chunk)
+                if digest.hexdigest() != checksum:
+                    return False
+            self.Q = np.load(path + '.npy', mmap_mode='r')
+            self.seen = np.load(path + '.seen.npy', mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return False
+        return True
+
+    def load_or_train(self, game, retrain: bool = False):
+        """
+        Load the saved table of the current config, or train and save one if there is none or retrain is set.
+        """
+        if not retrain and self.load():
+            print(f"Loaded Q Player [{self.letter}] table from {self.table_path()}.npy")
+            return
+        letter = self.letter
+        self.train(game)
+        # The sequential trainer swaps letters every episode
+        self.letter = letter
+        self.save()
+
+    def clear(self, seed):
+        self.random = random.Random(seed)
 
-    def get_move(self, game: TicTacToe):
-        self.epsilon = 0
-        move = self.choose_action(game)
+    def get_move(self, game: TicTacToe, deadline=None):
+        start_time = time.perf_counter() if self.stats_enabled else None
+        # Greedy moves, without changing the exploration rate that the saved table depends on
+        move = self.choose_action(game, epsilon=0)
+        if self.stats_enabled:
+            # A miss is a board never seen in training, played at random
+            row, _ = self.table_index(game.state_id)
+            self.record_stats(table_hits=int(self.seen[row]), time=time.perf_counter() - start_time)
         return move
     
     def __str__(self):
@@ -0,0 +1,78 @@
+"""
+This module contains a batched random rollout engine for the MCTS Player.
+
+Boards are rows of an (N, size*size) int8 array with 0 for empty cells, 1 for 'X' and 2 for 'O'
+(see PLAYER_DIGITS). All playouts advance one ply together: every unfinished board gets a uniformly random
+empty cell, and wins are detected with one vectorized check over the win lines.
+"""
+import numpy as np
+from ..game import Game, PLAYER_DIGITS
+
+NO_WINNER = 0
+
+def win_lines(size: int = 3, k: int = 3) -> np.ndarray:
+    """
+    Cells (size*x + y) of every k-in-a-row window of a size x size board.
+    :return: array of shape (number of lines, k)
+    """
+    lines = []
+    for x in range(size):
+        for y in range(size):
+            for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_x, end_y = x + (k - 1) * dx, y + (k - 1) * dy
+                if 0 <= end_x < size and 0 <= end_y < size:
+                    lines.append([size * (x + i * dx) + (y + i * dy) for i in range(k)])
+    return np.array(lines, dtype=np.intp)
+
+def encode(game: Game) -> np.ndarray:
+    """
+    Board of the game as a flat int8 row.
+    """
+    return np.array([PLAYER_DIGITS.get(cell, 0) for row in game.board_state for cell in row], dtype=np.int8)
+
+class RolloutEngine():
+    def __init__(self, size: int = 3, k: int = 3):
+        """
+        :param size: board size
+        :param k: number of stones in a row to win
+        """
+        self.size = size
+        self.lines = win_lines(size, k)
+
+    def winners(self, boards: np.ndarray) -> np.ndarray:
+        """
+        :return: PLAYER_DIGITS of the player owning a full line on each board, or NO_WINNER
+        """
+        pieces = boards[:, self.lines]
+        result = np.full(len(boards), NO_WINNER, dtype=np.int8)
+        for digit in PLAYER_DIGITS.values():
+            result[(pieces == digit).all(axis=2).any(axis=1)] = digit
+        return result
+
+    def rollout(self, boards: np.ndarray, to_move: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Play random moves on all boards in lockstep until every game is over. The boards are modified in place.
+        :param boards: (N, size*size) int8 boards
+        :param to_move: (N,) PLAYER_DIGITS of the player to move on each board
+        :param rng: random generator for the moves
+        :return: (N,) PLAYER_DIGITS of the winner of each playout, or NO_WINNER for a draw
+        """
+        to_move = to_move.astype(np.int8)
+        result = self.winners(boards)
+        active = np.flatnonzero((result == NO_WINNER) & (boards == 0).any(axis=1))
+        while active.size:
+            sub = boards[active]
+            # Random argmax over the empty cells picks a uniformly random legal move
+            scores = rng.random(sub.shape)
+            scores[sub != 0] = -1
+            cells = scores.argmax(axis=1)
+            movers = to_move[active]
+            sub[np.arange(len(active)), cells] = movers
+            boards[active] = sub
+            to_move[active] = 3 - movers
+
+            won = (sub[:, self.lines] == movers[:, None, None]).all(axis=2).any(axis=1)
+            result[active[won]] = movers[won]
+            full = (sub != 0).all(axis=1)
+            active = active[~won & ~full]
+        return result
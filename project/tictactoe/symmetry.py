@@ -0,0 +1,25 @@
+"""
+This module contains the 8 symmetries (rotations and reflections) of the 3x3 board as cell permutations.
+Cells are numbered 3*x + y. SYMMETRIES[g][cell] is the cell that `cell` is mapped to by symmetry g,
+and INVERSE_SYMMETRIES[g] maps it back. Symmetry 0 is the identity.
+"""
+
+def _rotate(x, y):
+    return y, 2 - x
+
+def _reflect(x, y):
+    return x, 2 - y
+
+def _permutation(num_rotations, reflect):
+    permutation = []
+    for cell in range(9):
+        x, y = cell // 3, cell % 3
+        if reflect:
+            x, y = _reflect(x, y)
+        for _ in range(num_rotations):
+            x, y = _rotate(x, y)
+        permutation.append(3 * x + y)
+    return tuple(permutation)
+
+SYMMETRIES = tuple(_permutation(num_rotations, reflect) for reflect in (False, True) for num_rotations in range(4))
+INVERSE_SYMMETRIES = tuple(tuple(permutation.index(cell) for cell in range(9)) for permutation in SYMMETRIES)
@@ -0,0 +1,110 @@
+"""
+This module contains a transposition table for the search players of the TicTacToe game.
+
+Positions are keyed by Zobrist hashes canonicalized over the 8 symmetries of the board: the search keeps
+one hash per symmetry up to date with update_keys(), and the table key is the smallest of the 8. Best
+moves are stored in the frame of that canonical symmetry and mapped back on lookup.
+"""
+import random
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from .symmetry import SYMMETRIES, INVERSE_SYMMETRIES
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+DEFAULT_TT_SIZE = 100000
+
+# Zobrist keys for each player and cell, fixed so hashes are identical across runs and processes
+_rng = random.Random(2050)
+ZOBRIST = {letter: tuple(_rng.getrandbits(64) for _ in range(9)) for letter in ('X', 'O')}
+# Keys XOR-ed into the 8 symmetric hashes when a player takes a cell: SYMMETRY_KEYS[letter][cell][g]
+SYMMETRY_KEYS = {letter: tuple(tuple(keys[permutation[cell]] for permutation in SYMMETRIES) for cell in range(9)) for letter, keys in ZOBRIST.items()}
+
+def symmetry_keys(board_state) -> List[int]:
+    """
+    Compute the 8 symmetric Zobrist hashes of a board.
+    :param board_state: 3x3 board of 'X', 'O' or None
+    :return: list of 8 hashes, one per symmetry in SYMMETRIES
+    """
+    keys = [0] * len(SYMMETRIES)
+    for cell in range(9):
+        letter = board_state[cell // 3][cell % 3]
+        if letter is not None:
+            update_keys(keys, letter, cell)
+    return keys
+
+def update_keys(keys: List[int], player_letter: str, cell: int) -> None:
+    """
+    Add or remove (XOR is its own inverse) a piece of player_letter on cell in all 8 hashes, in place.
+    """
+    cell_keys = SYMMETRY_KEYS[player_letter][cell]
+    for g in range(8):
+        keys[g] ^= cell_keys[g]
+
+class TranspositionTable():
+    def __init__(self, max_size: int = DEFAULT_TT_SIZE):
+        """
+        Transposition table with least-recently-used eviction once max_size entries are stored.
+        Each entry is (value, bound type, depth, best move cell in the canonical frame).
+        :param max_size: maximum number of entries
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stores = 0
+
+    def lookup(self, keys: List[int]) -> Tuple[Optional[tuple], int]:
+        """
+        Find the entry of the position with the given symmetric hashes.
+        :param keys: the 8 symmetric hashes of the position
+        :return: (entry or None, symmetry index of the canonical frame)
+        """
+        key = min(keys)
+        g = keys.index(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry, g
+
+    def store(self, keys: List[int], value: float, bound: int, depth: int, best_cell: Optional[int]) -> None:
+        """
+        Store the search result of a position, evicting the least recently used entry if the table is full.
+        :param keys: the 8 symmetric hashes of the position
+        :param value: searched value
+        :param bound: EXACT, LOWER or UPPER
+        :param depth: remaining depth of the search
+        :param best_cell: best move (3*x + y) in the frame of the position, or None
+        """
+        key = min(keys)
+        if best_cell is not None:
+            best_cell = SYMMETRIES[keys.index(key)][best_cell]
+        if key not in self.entries and len(self.entries) >= self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = (value, bound, depth, best_cell)
+        self.entries.move_to_end(key)
+        self.stores += 1
+
+    @staticmethod
+    def best_cell(entry: tuple, g: int) -> Optional[int]:
+        """
+        Map the best move of an entry from the canonical frame back to the frame of the probed position.
+        """
+        if entry[3] is None:
+            return None
+        return INVERSE_SYMMETRIES[g][entry[3]]
+
+    def stats(self) -> dict:
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'stores': self.stores}
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
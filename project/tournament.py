@@ -0,0 +1,100 @@
+"""
+This module contains the tournament runner, which plays the games of an evaluation in parallel on a process pool.
+
+Each worker process builds the game and both players once, then plays whole games on request with the headless
+match loop, play_match(). Player 1 is 'X' in odd games and 'O' in even games, as with GamePlay.switch_players().
+Each game seeds the random module with the tournament seed plus its index, and Player.clear() reseeds the players
+and drops their caches from earlier games. Without a timeout, the results therefore do not depend on which worker
+plays which game. With a timeout, searches stop at a wall-clock deadline and results vary from run to run. Workers
+return the records of their games, and only the parent process writes the results log.
+"""
+import contextlib
+import io
+import itertools
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, Optional
+from tqdm import tqdm
+from . import Game, Player
+from .headless import GameResult, MatchSummary, play_match
+from .results import ResultsWriter
+
+# Games queued per worker
+WINDOW = 2
+
+# Game, players and settings of the worker process, set by init_worker()
+_worker = {}
+
+def init_worker(game_args: dict, player_args: dict, timeout: Optional[float], seed: int, log_moves: bool = False, stats: bool = False):
+    """
+    Build the game and the players of a worker process. Q-Learning players load the tables saved by the parent.
+    """
+    game = Game(**game_args)
+    players = Player(**player_args)
+    for player in players:
+        player.enable_stats(stats)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for player in players:
+            if hasattr(player, 'load_or_train'):
+                player.load_or_train(game)
+    _worker.update(game=game, players=players, timeout=timeout, seed=seed, log_moves=log_moves)
+
+def play_game(game_index: int) -> GameResult:
+    """
+    Play game number game_index (from 1) in the worker process.
+    """
+    return play_match(_worker['game'], _worker['players'], game_index, _worker['timeout'], _worker['seed'], _worker['log_moves'])
+
+def run_tournament(game_args: dict, player_args: dict, num_games: int, num_workers: int, timeout: Optional[float] = None, silent: bool = True, progress: bool = True, headless: bool = False, seed: Optional[int] = None, results: Optional[ResultsWriter] = None, stats: bool = False, names: Optional[List[str]] = None):
+    """
+    Play num_games games between the players built by project.Player(**player_args) on num_workers processes,
+    then print the same final scoreboard as GamePlay, or as run_headless() if headless is set.
+    :param game_args: arguments of project.Game()
+    :param player_args: arguments of project.Player()
+    :param timeout: time limit of each move in seconds, or None
+    :param silent: do not show the result of each game
+    :param progress: show a progress bar in silent mode
+    :param headless: add the move duration percentiles and games per second to the final scoreboard
+    :param seed: tournament seed, random if None
+    :param results: log of the games and moves, if any. Games are logged in order of completion
+    :param stats: record the search statistics of the players and add them to the final scoreboard
+    :param names: names of player 1 and player 2, if the caller has built the players already
+    :return: number of wins of player 1 and player 2
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    if names is None:
+        names = [str(player) for player in Player(**player_args)]
+    summary = MatchSummary(names)
+    evaluation_start_time = time.perf_counter()
+    
+    if not headless:
+        print("--------------------------------------------------")
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=init_worker, initargs=(game_args, player_args, timeout, seed, results is not None and results.log_moves, stats)) as pool:
+        # At most WINDOW games per worker are queued, and results are dropped once added, so the parent keeps
+        # constant memory whatever the number of games
+        progress_bar = tqdm(total=num_games) if silent and progress else None
+        game_indices = iter(range(1, num_games + 1))
+        pending = {pool.submit(play_game, game_index) for game_index in itertools.islice(game_indices, WINDOW * num_workers)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                summary.add(result, results)
+                if progress_bar is not None:
+                    progress_bar.update()
+                if not silent:
+                    if result.winner is None:
+                        print(f"Game {result.game_index} result: Draw!")
+                    else:
+                        print(f"Game {result.game_index} result: {names[result.winner]} wins in {(result.num_moves + 1) // 2} moves!")
+                    print("--------------------------------------------------")
+                game_index = next(game_indices, None)
+                if game_index is not None:
+                    pending.add(pool.submit(play_game, game_index))
+        if progress_bar is not None:
+            progress_bar.close()
+    
+    summary.print(time.perf_counter() - evaluation_start_time, percentiles=headless)
+    return summary.wins
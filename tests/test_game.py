@@ -0,0 +1,98 @@
+"""
+Tests of the incremental TicTacToe engines against a naive engine that rescans the board. Run with `python -m pytest tests`.
+"""
+import random
+import pytest
+from project.game import TicTacToe, BitboardTicTacToe, WIN_LINES, CELLS
+
+ENGINES = [TicTacToe, BitboardTicTacToe]
+
+def naive_winner(board):
+    """
+    :return: (winner, first completed line in WIN_LINES order) of a list of 9 cells, or (None, [])
+    """
+    for line in WIN_LINES:
+        letters = {board[3 * x + y] for x, y in line}
+        if len(letters) == 1 and None not in letters:
+            return letters.pop(), list(line)
+    return None, []
+
+def assert_same_state(game, board, to_move):
+    winner, win_combo = naive_winner(board)
+    assert game.board_state == [board[0:3], board[3:6], board[6:9]]
+    assert game.curr_player == to_move
+    assert game.winner == winner
+    assert game.win_combo == win_combo
+    assert game.wins('X') == (winner == 'X') and game.wins('O') == (winner == 'O')
+    assert game.game_over() == (winner is not None or None not in board)
+    assert game.num_empty_cells() == board.count(None)
+    assert [list(cell) for cell in game.empty_cells()] == [[x, y] for x, y in CELLS if board[3 * x + y] is None]
+    assert game.state_id == sum({None: 0, 'X': 1, 'O': 2}[letter] * 3 ** (8 - cell) for cell, letter in enumerate(board))
+    if isinstance(game, TicTacToe) and not isinstance(game, BitboardTicTacToe):
+        counts = [sum(board[3 * x + y] == letter for x, y in line) for letter in ('X', 'O') for line in WIN_LINES]
+        assert game.line_counts == counts
+        assert game.num_moves == 9 - board.count(None)
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_every_reachable_position_with_push_and_pop(engine):
+    # Depth-first walk of every position reachable in a game, checked after each push and after each pop
+    game = engine()
+    board = [None] * 9
+    visited = set()
+    
+    def walk(to_move):
+        assert_same_state(game, board, to_move)
+        visited.add(game.state_id)
+        if game.game_over():
+            return
+        for x, y in CELLS:
+            if board[3 * x + y] is not None:
+                assert not game.valid_move(x, y) and not game.push(x, y)
+                continue
+            assert game.valid_move(x, y)
+            board[3 * x + y] = to_move
+            assert game.push(x, y)
+            if game.state_id not in visited:
+                walk('O' if to_move == 'X' else 'X')
+            game.pop()
+            board[3 * x + y] = None
+            assert_same_state(game, board, to_move)
+    
+    walk('X')
+    assert len(visited) == 5478
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_random_games_with_set_move_reset_move_and_copy(engine):
+    rng = random.Random(0)
+    for _ in range(200):
+        game = engine()
+        board = [None] * 9
+        to_move = 'X'
+        while not game.game_over():
+            x, y = rng.choice(game.empty_cells())
+            assert game.set_move(x, y, to_move)
+            board[3 * x + y] = to_move
+            to_move = 'O' if to_move == 'X' else 'X'
+            assert_same_state(game, board, to_move)
+        
+        # A copy is independent of the game
+        copy = game.copy()
+        assert type(copy) is engine
+        cell = rng.choice([cell for cell in range(9) if board[cell] is not None])
+        letter = board[cell]
+        copy.reset_move(cell // 3, cell % 3)
+        assert_same_state(game, board, to_move)
+        board[cell] = None
+        assert_same_state(copy, board, letter)
+        
+        game.restart()
+        assert_same_state(game, [None] * 9, 'X')
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_wins_of_a_given_state_does_not_change_the_game(engine):
+    game = engine()
+    game.set_move(1, 1, 'X')
+    state = [['O', 'O', 'O'], ['X', 'X', None], [None, None, None]]
+    assert game.wins('O', state) and not game.wins('X', state)
+    assert game.win_combo == [] and game.winner is None
+    assert [list(cell) for cell in game.empty_cells(state)] == [[1, 2], [2, 0], [2, 1], [2, 2]]
@@ -0,0 +1,36 @@
+"""
+Unit tests of the SPRT and rating fit of the ladder. Run with `python -m pytest tests`.
+"""
+import numpy as np
+import pytest
+from project.ladder import sprt_llr, sprt_decision, fit_ratings
+
+def test_no_games_is_undecided():
+    assert sprt_llr(0, 0, 0, 0, 100) == 0.0
+    assert sprt_decision(0, 0, 0) is None
+
+def test_all_draws_accepts_equal():
+    decisions = [sprt_decision(0, num_games, 0) for num_games in range(2, 41, 2)]
+    assert 'equal' in decisions
+    # Once accepted, more draws never change the decision
+    first = decisions.index('equal')
+    assert all(decision is None for decision in decisions[:first])
+    assert all(decision == 'equal' for decision in decisions[first:])
+
+@pytest.mark.parametrize('wins', [True, False])
+def test_all_wins_decides_quickly(wins):
+    expected = 'player1' if wins else 'player2'
+    decisions = [sprt_decision(n, 0, 0) if wins else sprt_decision(0, 0, n) for n in range(2, 11, 2)]
+    assert expected in decisions
+
+def test_symmetric_results_give_zero_ratings():
+    ratings, intervals = fit_ratings(3, {(0, 1): [5, 10, 5], (0, 2): [4, 2, 4], (1, 2): [3, 3, 3]})
+    np.testing.assert_allclose(ratings, 0, atol=1e-6)
+    assert np.all(intervals > 0)
+
+def test_stronger_player_gets_higher_rating():
+    ratings, intervals = fit_ratings(2, {(0, 1): [10, 0, 0]})
+    assert ratings[0] > 0 > ratings[1]
+    assert ratings.sum() == pytest.approx(0, abs=1e-6)
+    # Finite thanks to the prior draws
+    assert np.all(np.isfinite(ratings)) and np.all(np.isfinite(intervals))
@@ -0,0 +1,114 @@
+"""
+Tests of the Q-Learning trainers, the merge of the parallel trainer and the saved tables. Run with `python -m pytest tests`.
+"""
+import json
+import os
+import numpy as np
+import pytest
+from project.game import TicTacToe
+from project.headless import play_match
+from project.tictactoe import TTT_QPlayer, TTT_MinimaxPlayer
+from project.tictactoe.q_learning import merge_tables, LEARNING_RATE
+
+def trained_player(**kwargs) -> TTT_QPlayer:
+    player = TTT_QPlayer('X', **kwargs)
+    player.train(TicTacToe())
+    return player
+
+def results_against_minimax(player: TTT_QPlayer, num_games: int = 10) -> list:
+    game = TicTacToe()
+    players = [player, TTT_MinimaxPlayer('O')]
+    # Player 1 is 'X' in odd games and 'O' in even games
+    return [play_match(game, players, game_index, None, seed=0).winner for game_index in range(1, num_games + 1)]
+
+def test_batched_trainer_draws_against_minimax():
+    # The default trainer plays batches of games in lockstep, and the player must draw as 'X' and as 'O'
+    assert TTT_QPlayer('X').batch_size > 1
+    assert results_against_minimax(trained_player()) == [None] * 10
+
+@pytest.mark.parametrize('num_workers', [2, 4])
+def test_parallel_trainer_draws_against_minimax(num_workers):
+    # Merging the workers' tables must keep the progress of all of them
+    assert results_against_minimax(trained_player(num_workers=num_workers)) == [None] * 10
+
+def updated(value: float, target: float, num_updates: int) -> float:
+    for _ in range(num_updates):
+        value += LEARNING_RATE * (target - value)
+    return value
+
+def test_merge_of_one_worker_is_its_table():
+    base = np.zeros((4, 9), dtype=np.float32)
+    q = np.random.default_rng(0).random((1, 4, 9), dtype=np.float32)
+    updates = np.ones_like(q)
+    seen = np.ones((1, 4), dtype=np.bool_)
+    merged, merged_seen = merge_tables(base, q, updates, seen)
+    np.testing.assert_allclose(merged, q[0], rtol=1e-6)
+    assert merged_seen.all()
+
+def test_merge_adds_up_the_progress_of_the_workers():
+    base = np.zeros((1, 9), dtype=np.float32)
+    q = np.zeros((2, 1, 9), dtype=np.float32)
+    updates = np.zeros_like(q)
+    # Cell 0 only updated by the first worker, cell 1 by both towards the same target, cell 2 by no worker
+    q[0, 0, 0], updates[0, 0, 0] = updated(0, 1, 3), 3
+    q[:, 0, 1], updates[:, 0, 1] = updated(0, 1, 2), 2
+    base[0, 2] = q[:, 0, 2] = 0.5
+    seen = np.array([[True], [False]])
+    merged, merged_seen = merge_tables(base, q, updates, seen)
+    assert merged[0, 0] == pytest.approx(updated(0, 1, 3))
+    assert merged[0, 1] == pytest.approx(updated(0, 1, 4))
+    assert merged[0, 2] == 0.5
+    assert merged_seen.tolist() == [True]
+
+def random_table(**kwargs) -> TTT_QPlayer:
+    player = TTT_QPlayer('X', **kwargs)
+    rng = np.random.default_rng(0)
+    player.Q = rng.random(player.Q.shape, dtype=np.float32)
+    player.seen = rng.random(player.seen.shape) < 0.5
+    return player
+
+def test_saved_table_loads_for_the_same_config(tmp_path):
+    player = random_table()
+    player.save(str(tmp_path))
+    loaded = TTT_QPlayer('X')
+    assert loaded.load(str(tmp_path))
+    np.testing.assert_array_equal(loaded.Q, player.Q)
+    np.testing.assert_array_equal(loaded.seen, player.seen)
+    # Tables are mapped read-only
+    assert not loaded.Q.flags.writeable
+
+@pytest.mark.parametrize('attribute, value', [('table_letter', 'O'), ('seed', 1), ('symmetric', True), ('batch_size', 1), ('num_workers', 2), ('num_episodes', 1000)])
+def test_saved_table_is_not_loaded_for_another_config(tmp_path, attribute, value):
+    random_table().save(str(tmp_path))
+    other = TTT_QPlayer('X')
+    setattr(other, attribute, value)
+    assert not other.load(str(tmp_path))
+
+def test_table_with_other_config_or_checksum_is_not_loaded(tmp_path):
+    player = random_table()
+    player.save(str(tmp_path))
+    path = player.table_path(str(tmp_path))
+    with open(path + '.json') as f:
+        metadata = json.load(f)
+    
+    # A table saved under the path of another config
+    metadata['config']['seed'] += 1
+    with open(path + '.json', 'w') as f:
+        json.dump(metadata, f)
+    assert not TTT_QPlayer('X').load(str(tmp_path))
+    metadata['config']['seed'] -= 1
+    with open(path + '.json', 'w') as f:
+        json.dump(metadata, f)
+    assert TTT_QPlayer('X').load(str(tmp_path))
+    
+    # A copied table is hashed since its modification time changed, and loads if its content is unchanged
+    stat = os.stat(path + '.npy')
+    os.utime(path + '.npy', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert TTT_QPlayer('X').load(str(tmp_path))
+    # A corrupted table fails the checksum
+    with open(path + '.npy', 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 1]))
+    assert not TTT_QPlayer('X').load(str(tmp_path))
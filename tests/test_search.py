@@ -0,0 +1,141 @@
+"""
+Tests of the search players and the oracle table against an exhaustive minimax solver. Run with `python -m pytest tests`.
+"""
+import random
+from functools import lru_cache
+import pytest
+from project.game import TicTacToe, WIN_LINES
+from project.tictactoe import TTT_AlphaBetaPlayer, TTT_MCTSPlayer
+from project.tictactoe.mcts import WIN
+from project.tictactoe.oracle import build_oracle_table, load_oracle_table, NUM_STATES, MOVES_MASK, VALUE_SHIFT, REACHABLE
+from project.tictactoe.symmetry import SYMMETRIES
+from project.tictactoe.transposition import TranspositionTable, symmetry_keys, EXACT
+
+SIGN = {'X': 1, 'O': -1}
+
+@lru_cache(maxsize=None)
+def solve(board: tuple, to_move: str):
+    """
+    Exhaustive minimax on a tuple of 9 cells.
+    :return: (value, set of optimal cells), the value is 1 if X wins, -1 if O wins and 0 for a draw
+    """
+    for line in WIN_LINES:
+        letters = {board[3 * x + y] for x, y in line}
+        if len(letters) == 1 and None not in letters:
+            return SIGN[letters.pop()], frozenset()
+    if None not in board:
+        return 0, frozenset()
+    next_letter = 'O' if to_move == 'X' else 'X'
+    scores = {cell: SIGN[to_move] * solve(board[:cell] + (to_move,) + board[cell + 1:], next_letter)[0] for cell in range(9) if board[cell] is None}
+    best = max(scores.values())
+    return SIGN[to_move] * best, frozenset(cell for cell, score in scores.items() if score == best)
+
+def reachable_positions():
+    """
+    :return: {state id: (board tuple, player to move)} of every position reachable in a game
+    """
+    positions = {}
+    game = TicTacToe()
+    
+    def walk():
+        if game.state_id in positions:
+            return
+        positions[game.state_id] = (tuple(cell for row in game.board_state for cell in row), game.curr_player)
+        if game.game_over():
+            return
+        for x, y in game.empty_cells():
+            game.push(x, y)
+            walk()
+            game.pop()
+    
+    walk()
+    return positions
+
+POSITIONS = reachable_positions()
+
+def game_of(board: tuple, to_move: str) -> TicTacToe:
+    game = TicTacToe()
+    letter = 'X'
+    # Replay the pieces alternately, so the counters of the game are those of a played game
+    pieces = {letter: [cell for cell in range(9) if board[cell] == letter] for letter in ('X', 'O')}
+    while pieces['X'] or pieces['O']:
+        cell = pieces[letter].pop()
+        game.set_move(cell // 3, cell % 3, letter)
+        letter = 'O' if letter == 'X' else 'X'
+    assert game.curr_player == to_move
+    return game
+
+def test_oracle_table_matches_minimax(tmp_path):
+    path = str(tmp_path / 'oracle.bin')
+    table = build_oracle_table(path)
+    assert (load_oracle_table(path) == table).all()
+    assert len(POSITIONS) == 5478
+    for state_id in range(NUM_STATES):
+        entry = int(table[state_id])
+        if state_id not in POSITIONS:
+            assert entry == 0
+            continue
+        value, moves = solve(*POSITIONS[state_id])
+        assert entry & REACHABLE
+        assert ((entry >> VALUE_SHIFT) & 3) - 1 == value
+        assert {cell for cell in range(9) if (entry & MOVES_MASK) >> cell & 1} == moves
+
+def test_alphabeta_plays_optimal_moves():
+    # One player per letter keeps its transposition table over all the positions, as it does across games
+    players = {letter: TTT_AlphaBetaPlayer(letter) for letter in ('X', 'O')}
+    for board, to_move in POSITIONS.values():
+        if board.count(None) == 9 or solve(board, to_move)[1] == frozenset():
+            continue
+        x, y = players[to_move].get_move(game_of(board, to_move))
+        assert 3 * x + y in solve(board, to_move)[1], (board, to_move)
+
+def test_alphabeta_without_table_or_with_deadline_plays_optimal_moves():
+    rng = random.Random(0)
+    positions = rng.sample([position for position in POSITIONS.values() if 0 < position[0].count(None) < 9 and solve(*position)[1]], 200)
+    for tt_size, deadline in ((0, None), (10, None), (100000, float('inf'))):
+        players = {letter: TTT_AlphaBetaPlayer(letter, tt_size=tt_size) for letter in ('X', 'O')}
+        for board, to_move in positions:
+            x, y = players[to_move].get_move(game_of(board, to_move), deadline)
+            assert 3 * x + y in solve(board, to_move)[1], (tt_size, board, to_move)
+
+def test_transposition_table_maps_moves_across_symmetries():
+    board = ['X', 'O', None, None, None, 'X', None, None, None]
+    images = []
+    for permutation in SYMMETRIES:
+        image = [None] * 9
+        for cell, letter in enumerate(board):
+            image[permutation[cell]] = letter
+        images.append([image[0:3], image[3:6], image[6:9]])
+    # The board has no symmetry of its own, so the 8 images are distinct
+    assert len({str(image) for image in images}) == 8
+    
+    tt = TranspositionTable()
+    best_cell = 8
+    tt.store(symmetry_keys(images[0]), 1, EXACT, 6, best_cell)
+    for permutation, image in zip(SYMMETRIES, images):
+        keys = symmetry_keys(image)
+        entry, g = tt.lookup(keys)
+        assert entry == tt.entries[min(keys)]
+        assert entry[:3] == (1, EXACT, 6)
+        assert TranspositionTable.best_cell(entry, g) == permutation[best_cell]
+    assert len(tt) == 1 and tt.hits == 8
+
+@pytest.mark.parametrize('num_empty', [3, 5, 7])
+def test_mcts_solver_proofs_match_minimax(num_empty):
+    rng = random.Random(num_empty)
+    positions = [position for position in POSITIONS.values() if position[0].count(None) == num_empty and solve(*position)[1]]
+    for board, to_move in rng.sample(positions, 10):
+        random.seed(0)
+        player = TTT_MCTSPlayer(to_move, num_simulations=20000, solver=True)
+        tree = player.tree
+        root = player.search(game_of(board, to_move), tree.reset(to_move))
+        value, moves = solve(board, to_move)
+        # Proven values are for the player who moved into the node
+        assert tree.solved[root] and tree.value[root] == -SIGN[to_move] * value
+        next_letter = 'O' if to_move == 'X' else 'X'
+        first = tree.first_child[root]
+        for child in range(first, first + tree.num_children[root]):
+            cell = int(tree.move[child])
+            if tree.solved[child]:
+                assert tree.value[child] == SIGN[to_move] * solve(board[:cell] + (to_move,) + board[cell + 1:], next_letter)[0]
+        assert int(tree.move[tree.best_proven_child(root)]) in moves
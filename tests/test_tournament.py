@@ -0,0 +1,24 @@
+"""
+Tests of the tournament runner. Run with `python -m pytest tests`.
+"""
+import os
+import subprocess
+import sys
+import pytest
+from project.tournament import run_tournament
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_same_results_with_any_number_of_workers(capsys):
+    results = [run_tournament(dict(game='tictactoe'), dict(player1='alphabeta', player2='random'), 6, num_workers, seed=7, progress=False) for num_workers in (1, 2)]
+    assert results[0] == results[1]
+
+def test_parallel_mcts_in_workers_exits():
+    # Each tournament worker owns a pool of MCTS search processes, which must be shut down when it exits
+    command = [sys.executable, 'main.py', '-p1', 'mcts', '-p2', 'random', '-m', 'silent', '-n', '2', '-w', '2', '--mcts_workers', '2', '-nt']
+    try:
+        completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=120)
+    except subprocess.TimeoutExpired:
+        pytest.fail("The tournament did not exit")
+    assert completed.returncode == 0, completed.stderr
+    assert "MCTS Player wins" in completed.stdout